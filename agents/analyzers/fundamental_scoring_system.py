@@ -8,16 +8,27 @@ Versão: 2.0 (Corrigida)
 """
 
 import asyncio
+import functools
+import inspect
 import json
 import logging
+import math
+import operator
+import os
+import re
 import sys
+import threading
 import yfinance as yf
 import time
+import numpy as np
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple, Any, Union
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple, Any, Union, Callable
 from enum import Enum
 from pathlib import Path
 import importlib.util
@@ -25,6 +36,52 @@ import importlib.util
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+# Padrão de confiança na validação do Agno (compilado uma vez)
+_CONFIDENCE_RE = re.compile(r'confiança[:\s]+(\d+)', re.IGNORECASE)
+
+# Event loop persistente (em thread dedicada) para a validação síncrona
+_validation_loop: Optional[asyncio.AbstractEventLoop] = None
+_validation_loop_lock = threading.Lock()
+
+# Validade (segundos) das respostas do yfinance memoizadas na sessão
+_YF_CACHE_TTL = 3600
+
+@functools.lru_cache(maxsize=128)
+def _fetch_yf(stock_code: str, bucket: int) -> Tuple[Dict[str, Any], Any, Any]:
+    """Busca info, DRE e balanço no yfinance (memoizado por janela de tempo)
+    
+    bucket = int(time.time() // _YF_CACHE_TTL): muda a cada janela e
+    invalida as entradas antigas. Erros não são memoizados.
+    """
+    ticker = yf.Ticker(f"{stock_code}.SA")  # Formato B3
+    info = ticker.info
+    if not info or 'marketCap' not in info:
+        return info, None, None
+    return info, ticker.financials, ticker.balance_sheet
+
+def _latest_column(frame: Any) -> Dict[str, Any]:
+    """Coluna mais recente (primeira) de uma demonstração como dict"""
+    if frame is None or frame.empty:
+        return {}
+    return frame.iloc[:, 0].to_dict()
+
+def _pick(values: Dict[str, Any], key: str) -> float:
+    """Valor numérico de uma demonstração (0 se ausente ou NaN)"""
+    v = values.get(key)
+    return float(v) if v is not None and v == v else 0.0
+
+def _get_validation_loop() -> asyncio.AbstractEventLoop:
+    """Retorna o loop de validação, criando-o na primeira chamada"""
+    global _validation_loop
+    with _validation_loop_lock:
+        if _validation_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='scoring-validation-loop',
+                             daemon=True).start()
+            _validation_loop = loop
+    return _validation_loop
+
+# Carregado antes dos imports abaixo: database.connection lê o ambiente no import
 env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(env_path)
 
@@ -32,93 +89,157 @@ load_dotenv(env_path)
 # 1. INVESTIGAÇÃO E IMPORTS CORRIGIDOS
 # =================================================================
 
-def investigate_financial_calculator():
-    """Investiga problemas com o FinancialCalculator"""
-    print("🔍 INVESTIGANDO FINANCIAL CALCULATOR")
-    print("=" * 50)
-    
-    # Verificar se arquivo existe
+_CALCULATOR_CLASSES = ('FinancialCalculator', 'FinancialData', 'FinancialMetrics')
+
+_AGNO_IMPORTS = (
+    ('agno.agent', 'Agent'),
+    ('agno.models.anthropic', 'Claude'),
+    ('agno.tools.reasoning', 'ReasoningTools'),
+    ('agno.tools.yfinance', 'YFinanceTools')
+)
+
+@functools.lru_cache(maxsize=1)
+def _ensure_cwd_on_path() -> str:
+    """Garante (uma única vez) o diretório atual no sys.path"""
+    current_dir = str(Path.cwd())
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    return current_dir
+
+@functools.lru_cache(maxsize=1)
+def _collect_financial_calculator_diagnostics() -> Dict[str, Any]:
+    """Coleta (uma única vez) o diagnóstico do FinancialCalculator"""
     calc_path = Path("utils/financial_calculator.py")
-    print(f"Arquivo existe: {calc_path.exists()}")
+    current_dir = Path.cwd()
+    diagnostics = {
+        'exists': calc_path.exists(),
+        'size': None,
+        'classes_in_file': {},
+        'read_error': None,
+        'current_dir': str(current_dir),
+        'in_sys_path': str(current_dir) in sys.path,
+        'import_ok': False,
+        'import_error': None,
+        'unexpected_error': None,
+        'classes_in_module': {}
+    }
     
-    if calc_path.exists():
-        print(f"Tamanho do arquivo: {calc_path.stat().st_size} bytes")
+    if diagnostics['exists']:
+        diagnostics['size'] = calc_path.stat().st_size
         
         # Verificar conteúdo
         try:
-            with open(calc_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Verificar classes
-            classes_to_check = ['FinancialCalculator', 'FinancialData', 'FinancialMetrics']
-            for cls in classes_to_check:
-                if f"class {cls}" in content:
-                    print(f"✅ Classe {cls} encontrada no arquivo")
-                else:
-                    print(f"❌ Classe {cls} NÃO encontrada no arquivo")
-        
+            content = calc_path.read_text(encoding='utf-8')
+            diagnostics['classes_in_file'] = {
+                cls: f"class {cls}" in content for cls in _CALCULATOR_CLASSES
+            }
         except Exception as e:
-            print(f"❌ Erro ao ler arquivo: {e}")
-    
-    # Verificar PYTHONPATH
-    current_dir = Path.cwd()
-    print(f"\nDiretório atual: {current_dir}")
-    print(f"utils/ no sys.path: {str(current_dir) in sys.path}")
+            diagnostics['read_error'] = str(e)
     
     # Tentar import direto
     try:
-        sys.path.insert(0, str(current_dir))
+        _ensure_cwd_on_path()
         import utils.financial_calculator as fc
+        diagnostics['import_ok'] = True
+        diagnostics['classes_in_module'] = {
+            cls: hasattr(fc, cls) for cls in _CALCULATOR_CLASSES
+        }
+    except ImportError as e:
+        diagnostics['import_error'] = str(e)
+    except Exception as e:
+        diagnostics['unexpected_error'] = str(e)
+    
+    return diagnostics
+
+def investigate_financial_calculator():
+    """Investiga problemas com o FinancialCalculator"""
+    diagnostics = _collect_financial_calculator_diagnostics()
+    
+    print("🔍 INVESTIGANDO FINANCIAL CALCULATOR")
+    print("=" * 50)
+    print(f"Arquivo existe: {diagnostics['exists']}")
+    
+    if diagnostics['exists']:
+        print(f"Tamanho do arquivo: {diagnostics['size']} bytes")
+        for cls, found in diagnostics['classes_in_file'].items():
+            if found:
+                print(f"✅ Classe {cls} encontrada no arquivo")
+            else:
+                print(f"❌ Classe {cls} NÃO encontrada no arquivo")
+        if diagnostics['read_error']:
+            print(f"❌ Erro ao ler arquivo: {diagnostics['read_error']}")
+    
+    print(f"\nDiretório atual: {diagnostics['current_dir']}")
+    print(f"utils/ no sys.path: {diagnostics['in_sys_path']}")
+    
+    if diagnostics['import_ok']:
         print("✅ Import utils.financial_calculator: SUCESSO")
-        
-        # Verificar atributos
-        attrs = dir(fc)
-        for cls in ['FinancialCalculator', 'FinancialData', 'FinancialMetrics']:
-            if cls in attrs:
+        for cls, available in diagnostics['classes_in_module'].items():
+            if available:
                 print(f"✅ {cls} disponível no módulo")
             else:
                 print(f"❌ {cls} NÃO disponível no módulo")
+    elif diagnostics['import_error']:
+        print(f"❌ Import falhou: {diagnostics['import_error']}")
+    elif diagnostics['unexpected_error']:
+        print(f"❌ Erro inesperado: {diagnostics['unexpected_error']}")
+
+@functools.lru_cache(maxsize=1)
+def _collect_agno_diagnostics() -> Dict[str, Any]:
+    """Coleta (uma única vez) o diagnóstico do Agno"""
+    diagnostics = {
+        'available': False,
+        'error': None,
+        'version': None,
+        'attributes': [],
+        'imports': []
+    }
     
+    try:
+        import agno
     except ImportError as e:
-        print(f"❌ Import falhou: {e}")
-    except Exception as e:
-        print(f"❌ Erro inesperado: {e}")
+        diagnostics['error'] = str(e)
+        return diagnostics
+    
+    diagnostics['available'] = True
+    diagnostics['version'] = getattr(agno, '__version__', 'desconhecida')
+    diagnostics['attributes'] = [attr for attr in sorted(dir(agno)) if not attr.startswith('_')]
+    
+    # Tentar imports corretos: (módulo, classe, módulo encontrado, classe encontrada, erro)
+    for module_name, class_name in _AGNO_IMPORTS:
+        try:
+            module = importlib.import_module(module_name)
+            diagnostics['imports'].append(
+                (module_name, class_name, True, hasattr(module, class_name), None))
+        except ImportError as e:
+            diagnostics['imports'].append((module_name, class_name, False, False, str(e)))
+    
+    return diagnostics
 
 def investigate_agno():
     """Investiga estrutura do Agno"""
+    diagnostics = _collect_agno_diagnostics()
+    
     print("\n🔍 INVESTIGANDO AGNO")
     print("=" * 50)
     
-    try:
-        import agno
-        print(f"✅ Agno importado: versão {getattr(agno, '__version__', 'desconhecida')}")
-        
-        # Verificar estrutura
-        print("Estrutura do agno:")
-        for attr in sorted(dir(agno)):
-            if not attr.startswith('_'):
-                print(f"   • {attr}")
-        
-        # Tentar imports corretos
-        imports_to_test = [
-            ('agno.agent', 'Agent'),
-            ('agno.models.anthropic', 'Claude'),
-            ('agno.tools.reasoning', 'ReasoningTools'),
-            ('agno.tools.yfinance', 'YFinanceTools')
-        ]
-        
-        for module_name, class_name in imports_to_test:
-            try:
-                module = importlib.import_module(module_name)
-                if hasattr(module, class_name):
-                    print(f"✅ {module_name}.{class_name}: Disponível")
-                else:
-                    print(f"❌ {module_name}.{class_name}: Classe não encontrada")
-            except ImportError as e:
-                print(f"❌ {module_name}: Módulo não encontrado ({e})")
+    if not diagnostics['available']:
+        print(f"❌ Agno não disponível: {diagnostics['error']}")
+        return
     
-    except ImportError as e:
-        print(f"❌ Agno não disponível: {e}")
+    print(f"✅ Agno importado: versão {diagnostics['version']}")
+    
+    print("Estrutura do agno:")
+    for attr in diagnostics['attributes']:
+        print(f"   • {attr}")
+    
+    for module_name, class_name, module_found, class_found, error in diagnostics['imports']:
+        if not module_found:
+            print(f"❌ {module_name}: Módulo não encontrado ({error})")
+        elif class_found:
+            print(f"✅ {module_name}.{class_name}: Disponível")
+        else:
+            print(f"❌ {module_name}.{class_name}: Classe não encontrada")
 
 # =================================================================
 # 2. IMPORTS COM FALLBACKS INTELIGENTES
@@ -131,10 +252,10 @@ try:
     from agno.tools.reasoning import ReasoningTools
     from agno.tools.yfinance import YFinanceTools
     AGNO_AVAILABLE = True
-    print("✅ Agno importado com sucesso (versão correta)")
+    logger.debug("Agno importado com sucesso (versão correta)")
 except ImportError as e:
     AGNO_AVAILABLE = False
-    print(f"⚠️  Agno não disponível: {e}")
+    logger.warning("Agno não disponível: %s", e)
     
     # Fallback classes
     class Agent:
@@ -151,21 +272,19 @@ CALCULATOR_ERROR = None
 
 try:
     # Garantir que o diretório atual está no path
-    current_dir = Path.cwd()
-    if str(current_dir) not in sys.path:
-        sys.path.insert(0, str(current_dir))
+    _ensure_cwd_on_path()
     
     # Tentar import
     from utils.financial_calculator import FinancialCalculator, FinancialData, FinancialMetrics
     CALCULATOR_AVAILABLE = True
-    print("✅ FinancialCalculator importado com sucesso")
+    logger.debug("FinancialCalculator importado com sucesso")
     
 except ImportError as e:
     CALCULATOR_ERROR = str(e)
-    print(f"⚠️  FinancialCalculator não disponível: {e}")
+    logger.warning("FinancialCalculator não disponível: %s", e)
     
     # Classes mock
-    @dataclass
+    @dataclass(slots=True)
     class FinancialData:
         symbol: Optional[str] = None
         market_cap: Optional[float] = None
@@ -173,14 +292,11 @@ except ImportError as e:
         net_income: Optional[float] = None
         current_price: Optional[float] = None
     
-    @dataclass
+    @dataclass(slots=True)
     class FinancialMetrics:
         pe_ratio: Optional[float] = None
         roe: Optional[float] = None
         profit_margin: Optional[float] = None
-        
-        def __dict__(self):
-            return asdict(self)
     
     class FinancialCalculator:
         def calculate_all_metrics(self, data):
@@ -191,40 +307,49 @@ try:
     from database.models import Stock, FundamentalAnalysis
     from database.repositories import get_stock_repository, get_fundamental_repository
     DATABASE_AVAILABLE = True
-    print("✅ Database disponível")
+    logger.debug("Database disponível")
 except ImportError as e:
     DATABASE_AVAILABLE = False
-    print(f"⚠️  Database não disponível: {e}")
+    logger.warning("Database não disponível: %s", e)
+
+# Kernels das faixas de score (compilados com Numba quando disponível)
+from agents.analyzers.score_kernels import (
+    composite_score as _composite_kernel,
+    valuation_score as _valuation_kernel,
+    profitability_score as _profitability_kernel,
+    growth_score as _growth_kernel,
+    financial_health_score as _financial_health_kernel,
+    turnover_score as _efficiency_kernel,
+    score_universe as _score_universe_kernel,
+    category_scores_batch as _category_scores_kernel,
+    _PE_SLOPE_A, _PE_SLOPE_B, _PE_SLOPE_C,
+    _PB_SLOPE_A, _PB_SLOPE_B, _PB_SLOPE_C,
+    _ROE_SLOPE_A, _ROE_SLOPE_B, _ROE_SLOPE_C, _ROE_SLOPE_D,
+    _DEBT_SLOPE_A, _DEBT_SLOPE_B, _DEBT_SLOPE_C, _DEBT_SLOPE_D,
+    _CR_SLOPE_A, _CR_SLOPE_B, _CR_SLOPE_C, _CR_SLOPE_D,
+    _GROWTH_SLOPE_A, _GROWTH_SLOPE_B, _GROWTH_SLOPE_C, _GROWTH_SLOPE_D,
+    _TURNOVER_SLOPE_A, _TURNOVER_SLOPE_B, _TURNOVER_SLOPE_C
+)
 
-# Import do NumPy
+# Serialização JSON (orjson quando disponível)
 try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    NUMPY_AVAILABLE = False
-    # Funções matemáticas básicas como fallback
-    class np:
-        @staticmethod
-        def mean(data): return sum(data) / len(data) if data else 0
-        @staticmethod
-        def median(data): 
-            sorted_data = sorted(data)
-            n = len(sorted_data)
-            return sorted_data[n//2] if n % 2 == 1 else (sorted_data[n//2-1] + sorted_data[n//2]) / 2
-        @staticmethod
-        def std(data): 
-            if not data: return 0
-            mean_val = sum(data) / len(data)
-            return (sum((x - mean_val) ** 2 for x in data) / len(data)) ** 0.5
-        @staticmethod
-        def percentile(data, p): 
-            sorted_data = sorted(data)
-            k = (len(sorted_data) - 1) * p / 100
-            f = int(k)
-            c = k - f
-            if f + 1 < len(sorted_data):
-                return sorted_data[f] * (1 - c) + sorted_data[f + 1] * c
-            return sorted_data[f]
+    ORJSON_AVAILABLE = False
+
+def _json_default(obj: Any) -> Any:
+    """Mapeamentos somente leitura (análises do cache) serializam como dict"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+def _json_indented(data: Any) -> str:
+    """JSON indentado (2 espaços) para prompts; orjson quando disponível"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=_json_default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(data, indent=2, default=_json_default)
 
 # =================================================================
 # 3. MODELOS DE DADOS (mesmo da versão anterior)
@@ -237,20 +362,192 @@ class QualityTier(Enum):
     BELOW_AVERAGE = "below_average"
     POOR = "poor"
 
-@dataclass
+# Limites de tier (ordem crescente) e tiers correspondentes
+_TIER_THRESHOLDS = (30, 50, 70, 85)
+_TIERS_ASCENDING = (QualityTier.POOR, QualityTier.BELOW_AVERAGE, QualityTier.AVERAGE,
+                    QualityTier.GOOD, QualityTier.EXCELLENT)
+_TIER_BOUNDS_ARRAY = np.array(_TIER_THRESHOLDS, dtype=np.float64)
+_TIERS_ARRAY = np.array(_TIERS_ASCENDING, dtype=object)
+
+# Títulos das justificativas por tier
+_TIER_NAMES = MappingProxyType({
+    QualityTier.EXCELLENT: "EMPRESA EXCELENTE",
+    QualityTier.GOOD: "EMPRESA BOA",
+    QualityTier.AVERAGE: "EMPRESA MEDIANA",
+    QualityTier.BELOW_AVERAGE: "EMPRESA FRACA",
+    QualityTier.POOR: "EMPRESA PROBLEMÁTICA"
+})
+_TIER_TITLE = MappingProxyType({tier: tier.value.title() for tier in QualityTier})
+
+# Status dos componentes na justificativa (fixo após os imports)
+_STATUS_SUFFIX = (
+    f"STATUS DO SISTEMA:\n"
+    f"• FinancialCalculator: {'✅ Real' if CALCULATOR_AVAILABLE else '⚠️  Mock'}\n"
+    f"• Database: {'✅ Conectado' if DATABASE_AVAILABLE else '⚠️  Mock'}\n"
+    f"• Agno Framework: {'✅ Ativo' if AGNO_AVAILABLE else '⚠️  Inativo'}"
+)
+
+# Modelo da justificativa (preenchido com str.format_map)
+_JUSTIFICATION_TEMPLATE = """{tier_name} (Score: {composite_score:.1f}/100)
+
+ANÁLISE FUNDAMENTALISTA:
+• Valuation: {valuation_score:.1f}/100
+• Rentabilidade: {profitability_score:.1f}/100  
+• Crescimento: {growth_score:.1f}/100
+• Saúde Financeira: {financial_health_score:.1f}/100
+• Eficiência: {efficiency_score:.1f}/100
+
+QUALIDADE: {tier_title}
+SETOR: {sector}
+DATA: {analysis_date:%d/%m/%Y %H:%M}
+
+""" + _STATUS_SUFFIX
+
+# Limites de recomendação (ordem crescente) e recomendações correspondentes
+_RECOMMENDATION_THRESHOLDS = (30, 45, 65, 80)
+_RECOMMENDATIONS_ASCENDING = ("VENDA FORTE", "VENDA", "NEUTRO", "COMPRA", "COMPRA FORTE")
+_RECOMMENDATIONS_ARRAY = np.array(_RECOMMENDATIONS_ASCENDING, dtype=object)
+
+# Recomendação do ScoringEngine: tabela indexada por
+# (min(red flags, 3), faixa do score, faixa do quality_score),
+# com valores em índices de _RECOMMENDATIONS_ASCENDING
+_REC_SCORE_BOUNDS = (30, 50, 70, 85)
+_REC_QUALITY_BOUNDS = (60, 70, 80)
+_REC_SCORE_QUALITY_GRID = (
+    (0, 0, 0, 0),   # score < 30: VENDA FORTE
+    (1, 1, 1, 1),   # 30-50: VENDA
+    (1, 2, 2, 2),   # 50-70: NEUTRO com qualidade >= 60
+    (1, 2, 3, 3),   # 70-85: COMPRA com qualidade >= 70
+    (1, 2, 3, 4),   # >= 85: COMPRA FORTE com qualidade >= 80
+)
+_REC_TABLE = np.array([
+    _REC_SCORE_QUALITY_GRID,                      # 0 red flags
+    _REC_SCORE_QUALITY_GRID,                      # 1 red flag
+    np.full((5, 4), 1),                           # 2 red flags: VENDA
+    np.full((5, 4), 0)                            # 3+ red flags: VENDA FORTE
+], dtype=np.intp)
+_REC_SCORE_BOUNDS_ARRAY = np.array(_REC_SCORE_BOUNDS, dtype=np.float64)
+_REC_QUALITY_BOUNDS_ARRAY = np.array(_REC_QUALITY_BOUNDS, dtype=np.float64)
+
+# Ordem das categorias nas matrizes de scores em lote
+_SCORE_CATEGORIES = ('valuation', 'profitability', 'growth', 'financial_health', 'efficiency')
+_CATEGORY_GETTER = operator.attrgetter(*_SCORE_CATEGORIES)
+
+# Entradas do score simplificado do agente, lidas numa única chamada
+_PE_ROE_GETTER = operator.attrgetter('pe_ratio', 'roe')
+
+# Colunas das matrizes de filtros e red flags em lote
+_QUALITY_FILTER_NAMES = ('roe_above_15', 'sustainable_growth', 'controlled_debt', 'stable_margins')
+_RED_FLAG_LABELS = np.array(["ROE negativo", "Endividamento excessivo",
+                             "Margem líquida negativa", "Queda acentuada de receita"], dtype=object)
+
+# Métricas do MetricsFrame (uma coluna por métrica)
+_METRICS_FRAME_FIELDS = ('pe_ratio', 'pb_ratio', 'roe', 'roa', 'net_margin',
+                         'revenue_growth_3y', 'debt_ebitda', 'current_ratio', 'asset_turnover')
+
+def _metric_column(metrics: Any, name: str, default: Optional[float] = None) -> np.ndarray:
+    """Coluna de métricas como array float64 (NaN = ausente, substituído por default)"""
+    values = np.asarray(metrics[name], dtype=np.float64)
+    if default is not None:
+        values = np.where(np.isnan(values), default, values)
+    return values
+
+def scores_to_dict(scores: np.ndarray) -> Dict[str, float]:
+    """Converte o vetor de scores por categoria em dict nomeado"""
+    return dict(zip(_SCORE_CATEGORIES, scores.tolist()))
+
+@functools.lru_cache(maxsize=None)
+def _metric_fields(metrics_type: type) -> Tuple[str, ...]:
+    """Nomes dos campos de uma classe de métricas (dataclass), por tipo"""
+    if is_dataclass(metrics_type):
+        return tuple(f.name for f in fields(metrics_type))
+    return ()
+
+def _pe_roe(metrics: Any) -> Tuple[Any, Any]:
+    """(P/L, ROE) das métricas; atributos ausentes valem 15"""
+    try:
+        return _PE_ROE_GETTER(metrics)
+    except AttributeError:
+        return getattr(metrics, 'pe_ratio', 15), getattr(metrics, 'roe', 15)
+
+def _coerce_float(value: Any, default: float = np.nan) -> float:
+    """Converte para float; None, NaN e valores não numéricos viram default"""
+    if value is None:
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if value != value else value
+
+def _metric_value(metrics: Dict[str, Any], name: str) -> float:
+    """Métrica escalar para os kernels (NaN = ausente)"""
+    return _coerce_float(metrics.get(name))
+
+def _metric_key(metrics: Dict[str, Any], name: str) -> float:
+    """Métrica exata para chave de cache (ausente → np.nan único)
+
+    Sem arredondamento: o score é calculado a partir da própria chave, e
+    valores próximos dos degraus das faixas mudariam de faixa.
+    """
+    value = _coerce_float(metrics.get(name), None)
+    # NaN só é igual a si mesmo por identidade: usar sempre o objeto np.nan
+    return np.nan if value is None else value
+
+@functools.lru_cache(maxsize=64)
+def _weighted_sum_for(weights: Tuple[float, float, float, float, float]) -> Callable[..., float]:
+    """Soma ponderada especializada para um conjunto fixo de pesos
+
+    Pesos finitos viram constantes no código gerado; NaN/inf (sem literal
+    válido) usam uma closure equivalente. Fica fora do dataclass para
+    manter ScoringWeights serializável (pickle/asdict).
+    """
+    w_val, w_prof, w_growth, w_health, w_eff = weights
+    if not all(math.isfinite(w) for w in weights):
+        def weighted_sum(valuation, profitability, growth, financial_health, efficiency):
+            return (w_val * valuation + w_prof * profitability + w_growth * growth
+                    + w_health * financial_health + w_eff * efficiency)
+        return weighted_sum
+    
+    source = (
+        "def weighted_sum(valuation, profitability, growth, financial_health, efficiency):\n"
+        f"    return ({w_val!r} * valuation"
+        f" + {w_prof!r} * profitability"
+        f" + {w_growth!r} * growth"
+        f" + {w_health!r} * financial_health"
+        f" + {w_eff!r} * efficiency)\n"
+    )
+    namespace = {}
+    exec(compile(source, '<scoring_weights>', 'exec'), namespace)
+    return namespace['weighted_sum']
+
+@dataclass(slots=True, frozen=True)
 class ScoringWeights:
     valuation: float = 0.25
     profitability: float = 0.30
     growth: float = 0.20
     financial_health: float = 0.15
     efficiency: float = 0.10
+    
+    @property
+    def scorer(self) -> Callable[..., float]:
+        """Soma ponderada com os pesos desta instância como constantes"""
+        # Pesos imutáveis (slots + frozen): para alterar, crie uma nova instância
+        return _weighted_sum_for((float(self.valuation), float(self.profitability),
+                                  float(self.growth), float(self.financial_health),
+                                  float(self.efficiency)))
+    
+    def weighted_sum(self, valuation: float, profitability: float, growth: float,
+                     financial_health: float, efficiency: float) -> float:
+        """Soma ponderada dos scores por categoria"""
+        return self.scorer(valuation, profitability, growth, financial_health, efficiency)
 
     def validate(self) -> bool:
-        total = sum([self.valuation, self.profitability, self.growth, 
-                    self.financial_health, self.efficiency])
+        total = (self.valuation + self.profitability + self.growth
+                 + self.financial_health + self.efficiency)
         return abs(total - 1.0) < 0.001
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FundamentalScore:
     stock_code: str
     sector: str
@@ -269,10 +566,70 @@ class FundamentalScore:
     data_quality: float
     
     def to_dict(self) -> Dict[str, Any]:
-        result = asdict(self)
-        result['quality_tier'] = self.quality_tier.value
-        result['analysis_date'] = self.analysis_date.isoformat()
-        return result
+        # Campos primitivos: dict literal evita a cópia recursiva do asdict
+        return {
+            'stock_code': self.stock_code,
+            'sector': self.sector,
+            'valuation_score': self.valuation_score,
+            'profitability_score': self.profitability_score,
+            'growth_score': self.growth_score,
+            'financial_health_score': self.financial_health_score,
+            'efficiency_score': self.efficiency_score,
+            'composite_score': self.composite_score,
+            'sector_rank': self.sector_rank,
+            'sector_percentile': self.sector_percentile,
+            'overall_rank': self.overall_rank,
+            'overall_percentile': self.overall_percentile,
+            'quality_tier': self.quality_tier.value,
+            'analysis_date': self.analysis_date.isoformat(),
+            'data_quality': self.data_quality
+        }
+    
+    def to_json(self) -> bytes:
+        # orjson serializa dataclass, Enum e datetime nativamente (sem to_dict)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode('utf-8')
+
+@dataclass(slots=True, frozen=True)
+class MetricsFrame:
+    """Métricas de um universo de ações em colunas (struct-of-arrays)
+    
+    Cada campo é um array float (float64 por padrão) com uma posição por
+    ação; NaN indica métrica ausente.
+    """
+    pe_ratio: np.ndarray
+    pb_ratio: np.ndarray
+    roe: np.ndarray
+    roa: np.ndarray
+    net_margin: np.ndarray
+    revenue_growth_3y: np.ndarray
+    debt_ebitda: np.ndarray
+    current_ratio: np.ndarray
+    asset_turnover: np.ndarray
+    
+    @classmethod
+    def from_dicts(cls, metrics_list: List[Dict[str, Any]],
+                   dtype: Any = np.float64) -> 'MetricsFrame':
+        """Monta o frame a partir de dicts de métricas (None/ausente → NaN)
+        
+        dtype=np.float32 reduz à metade a memória do frame em universos
+        grandes; os scores continuam calculados em float64 (as colunas são
+        promovidas na entrada dos cálculos).
+        """
+        count = len(metrics_list)
+        return cls(**{
+            name: np.fromiter((_metric_value(metrics, name) for metrics in metrics_list),
+                              dtype=dtype, count=count)
+            for name in _METRICS_FRAME_FIELDS
+        })
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        # Permite usar o frame onde os métodos em lote esperam um DataFrame
+        return getattr(self, name)
+    
+    def __len__(self) -> int:
+        return len(self.pe_ratio)
 
 # =================================================================
 # 4. AGENTE ANALISADOR CORRIGIDO
@@ -290,6 +647,29 @@ class ScoringEngine:
     CORREÇÃO: Esta classe resolve o erro de import identificado no teste.
     """
     
+    # Prompt de validação (str.format; chaves literais duplicadas)
+    _VALIDATION_TEMPLATE = """
+                VALIDAÇÃO DE SCORE FUNDAMENTALISTA - {stock_code}
+                
+                MÉTRICAS CALCULADAS:
+                - P/L: {pe_ratio}
+                - P/VP: {pb_ratio}
+                - ROE: {roe}%
+                - ROA: {roa}%
+                - Margem Líquida: {net_margin}%
+                - Crescimento Receita: {revenue_growth}%
+                
+                SCORE CALCULADO: {score:.1f}/100
+                
+                TAREFA: Use raciocínio lógico para validar se este score faz sentido:
+                1. As métricas de valuation (P/L, P/VP) estão coerentes com o score?
+                2. As métricas de rentabilidade (ROE, margens) justificam este score?
+                3. Há alguma inconsistência evidente?
+                4. O score deveria ser ajustado? Se sim, para qual valor e por quê?
+                
+                Retorne em JSON: {{"validated_score": number, "adjustments": [], "confidence": number}}
+                """
+    
     def __init__(self, weights: Optional[ScoringWeights] = None):
         self.weights = weights or ScoringWeights()
         self.logger = logging.getLogger(__name__)
@@ -299,376 +679,526 @@ class ScoringEngine:
             self._normalize_weights()
         
         self._sector_benchmarks = {}
+        self._benchmarks_arr: Dict[str, np.ndarray] = {}
         self._percentile_cache = {}
         
         self.logger.info("ScoringEngine inicializado com sucesso")
     
+    @property
+    def weights(self) -> ScoringWeights:
+        return self._weights
+    
+    @weights.setter
+    def weights(self, weights: ScoringWeights):
+        self._weights = weights
+        # Vetor de pesos na ordem de _SCORE_CATEGORIES (composto em lote);
+        # os pesos fazem parte da chave do cache compartilhado entre engines
+        self._weights_arr = np.array(_CATEGORY_GETTER(weights), dtype=np.float64)
+        self._weights_key = tuple(self._weights_arr.tolist())
+    
+    def set_sector_benchmarks(self, benchmarks: Dict[str, Dict[str, float]]):
+        """Registra benchmarks por setor, pré-indexados como vetores
+        
+        Cada vetor segue a ordem de _METRICS_FRAME_FIELDS (NaN quando o
+        setor não tem benchmark para a métrica).
+        """
+        self._sector_benchmarks = benchmarks
+        self._benchmarks_arr = {
+            sector: np.array([_coerce_float(values.get(name)) for name in _METRICS_FRAME_FIELDS],
+                             dtype=np.float64)
+            for sector, values in benchmarks.items()
+        }
+    
+    def get_sector_benchmarks(self, sector: str) -> Optional[np.ndarray]:
+        """Vetor de benchmarks do setor (None se não registrado)"""
+        return self._benchmarks_arr.get(sector)
+    
     def _normalize_weights(self):
         """Normaliza os pesos para somar 1.0"""
-        total = sum([self.weights.valuation, self.weights.profitability, 
-                    self.weights.growth, self.weights.financial_health, 
-                    self.weights.efficiency])
+        weights = self.weights
+        total = (weights.valuation + weights.profitability + weights.growth
+                 + weights.financial_health + weights.efficiency)
         
         if total > 0:
-            self.weights.valuation /= total
-            self.weights.profitability /= total
-            self.weights.growth /= total
-            self.weights.financial_health /= total
-            self.weights.efficiency /= total
+            inv = 1.0 / total
+            self.weights = ScoringWeights(
+                valuation=weights.valuation * inv,
+                profitability=weights.profitability * inv,
+                growth=weights.growth * inv,
+                financial_health=weights.financial_health * inv,
+                efficiency=weights.efficiency * inv
+            )
     
     def calculate_valuation_score(self, metrics: Dict[str, Any], 
                                 sector_benchmarks: Optional[Dict[str, float]] = None) -> float:
         """Calcula score de valuation (0-100)"""
+        return _valuation_kernel(_metric_value(metrics, 'pe_ratio'),
+                                 _metric_value(metrics, 'pb_ratio'))
+        
+
+    async def acalculate_composite_score_with_validation(self, metrics: Dict[str, Any], 
+                                                        stock_code: str,
+                                                        reasoning_agent: Optional[Agent] = None) -> Tuple[float, Dict[str, Any]]:
+        """Calcula score com validação inteligente via ReasoningTools (assíncrono)"""
+        
+        # 1. Calcular score base (mantém lógica existente)
+        base_score, _ = self.calculate_composite_score_array(metrics)
+        
+        # Caminho comum: sem ReasoningTools não há prompt a montar
+        if not (reasoning_agent and hasattr(reasoning_agent, 'run')):
+            return base_score, {"validation_performed": False}
+        
+        # 2. Validar score com ReasoningTools
         try:
-            score_components = []
+            validation_prompt = self._VALIDATION_TEMPLATE.format(
+                stock_code=stock_code,
+                pe_ratio=metrics.get('pe_ratio', 'N/A'),
+                pb_ratio=metrics.get('pb_ratio', 'N/A'),
+                roe=metrics.get('roe', 'N/A'),
+                roa=metrics.get('roa', 'N/A'),
+                net_margin=metrics.get('net_margin', 'N/A'),
+                revenue_growth=metrics.get('revenue_growth', 'N/A'),
+                score=base_score
+            )
             
-            # P/L Score (menor é melhor)
-            pe_ratio = metrics.get('pe_ratio')
-            if pe_ratio and pe_ratio > 0:
-                if pe_ratio <= 8:
-                    pe_score = 100
-                elif pe_ratio <= 15:
-                    pe_score = 100 - ((pe_ratio - 8) / 7) * 30
-                elif pe_ratio <= 25:
-                    pe_score = 70 - ((pe_ratio - 15) / 10) * 50
-                else:
-                    pe_score = max(0, 20 - ((pe_ratio - 25) / 10) * 20)
-                
-                score_components.append(pe_score * 0.4)
+            # Usar ReasoningTools do Agno (run pode ser síncrono ou assíncrono)
+            validation_result = reasoning_agent.run(validation_prompt)
+            if inspect.isawaitable(validation_result):
+                validation_result = await validation_result
             
-            # P/VP Score
-            pb_ratio = metrics.get('pb_ratio')
-            if pb_ratio and pb_ratio > 0:
-                if pb_ratio <= 0.8:
-                    pb_score = 100
-                elif pb_ratio <= 2.0:
-                    pb_score = 100 - ((pb_ratio - 0.8) / 1.2) * 30
-                elif pb_ratio <= 4.0:
-                    pb_score = 70 - ((pb_ratio - 2.0) / 2.0) * 50
-                else:
-                    pb_score = max(0, 20 - ((pb_ratio - 4.0) / 2.0) * 20)
-                
-                score_components.append(pb_score * 0.3)
-            
-            if score_components:
-                total_weight = sum([0.4, 0.3][:len(score_components)])
-                final_score = sum(score_components) / total_weight
-                return max(0, min(100, final_score))
-            else:
-                return 50.0
+            return base_score, {
+                "validation_performed": True,
+                "reasoning_result": validation_result,
+                "original_score": base_score
+            }
             
         except Exception as e:
-            self.logger.error(f"Erro no cálculo de valuation: {e}")
-            return 50.0
+            self.logger.warning("Validação com ReasoningTools falhou: %s", e)
         
-
+        # Fallback para score base
+        return base_score, {"validation_performed": False}
+    
     def calculate_composite_score_with_validation(self, metrics: Dict[str, Any], 
                                                 stock_code: str,
                                                 reasoning_agent: Optional[Agent] = None) -> Tuple[float, Dict[str, Any]]:
-        """Calcula score com validação inteligente via ReasoningTools"""
-        
-        # 1. Calcular score base (mantém lógica existente)
-        base_score = self.calculate_composite_score(metrics, stock_code)
+        """Versão síncrona: executa no event loop persistente do módulo"""
+        # Sem agente não há I/O: evita o event loop (e sua thread)
+        if not (reasoning_agent and hasattr(reasoning_agent, 'run')):
+            return self.calculate_composite_score_array(metrics)[0], {"validation_performed": False}
         
-        # 2. Se ReasoningTools disponível, validar score
-        if reasoning_agent and hasattr(reasoning_agent, 'run'):
-            try:
-                validation_prompt = f"""
-                VALIDAÇÃO DE SCORE FUNDAMENTALISTA - {stock_code}
-                
-                MÉTRICAS CALCULADAS:
-                - P/L: {metrics.get('pe_ratio', 'N/A')}
-                - P/VP: {metrics.get('pb_ratio', 'N/A')}
-                - ROE: {metrics.get('roe', 'N/A')}%
-                - ROA: {metrics.get('roa', 'N/A')}%
-                - Margem Líquida: {metrics.get('net_margin', 'N/A')}%
-                - Crescimento Receita: {metrics.get('revenue_growth', 'N/A')}%
-                
-                SCORE CALCULADO: {base_score:.1f}/100
-                
-                TAREFA: Use raciocínio lógico para validar se este score faz sentido:
-                1. As métricas de valuation (P/L, P/VP) estão coerentes com o score?
-                2. As métricas de rentabilidade (ROE, margens) justificam este score?
-                3. Há alguma inconsistência evidente?
-                4. O score deveria ser ajustado? Se sim, para qual valor e por quê?
-                
-                Retorne em JSON: {{"validated_score": number, "adjustments": [], "confidence": number}}
-                """
-                
-                # Usar ReasoningTools do Agno
-                validation_result = asyncio.run(reasoning_agent.run(validation_prompt))
-                
-                return base_score, {
-                    "validation_performed": True,
-                    "reasoning_result": validation_result,
-                    "original_score": base_score
-                }
-                
-            except Exception as e:
-                self.logger.warning(f"Validação com ReasoningTools falhou: {e}")
-        
-        # Fallback para score base
-        return base_score, {"validation_performed": False}
+        coroutine = self.acalculate_composite_score_with_validation(metrics, stock_code, reasoning_agent)
+        return asyncio.run_coroutine_threadsafe(coroutine, _get_validation_loop()).result()
+    
+    async def score_many(self, tickers_metrics: Dict[str, Dict[str, Any]],
+                         reasoning_agent: Optional[Agent] = None) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        """Calcula e valida os scores de várias ações concorrentemente"""
+        results = await asyncio.gather(*(
+            self.acalculate_composite_score_with_validation(metrics, stock_code, reasoning_agent)
+            for stock_code, metrics in tickers_metrics.items()
+        ))
+        return dict(zip(tickers_metrics, results))
 
     
     def calculate_profitability_score(self, metrics: Dict[str, Any], 
                                     sector_benchmarks: Optional[Dict[str, float]] = None) -> float:
         """Calcula score de rentabilidade (0-100)"""
-        try:
-            score_components = []
-            
-            # ROE Score (maior é melhor)
-            roe = metrics.get('roe')
-            if roe is not None:
-                if roe >= 25:
-                    roe_score = 100
-                elif roe >= 20:
-                    roe_score = 90 + ((roe - 20) / 5) * 10
-                elif roe >= 15:
-                    roe_score = 70 + ((roe - 15) / 5) * 20
-                elif roe >= 10:
-                    roe_score = 40 + ((roe - 10) / 5) * 30
-                elif roe >= 0:
-                    roe_score = (roe / 10) * 40
-                else:
-                    roe_score = 0
-                
-                score_components.append(roe_score)
-            
-            if score_components:
-                return max(0, min(100, sum(score_components) / len(score_components)))
-            else:
-                return 50.0
-            
-        except Exception as e:
-            self.logger.error(f"Erro no cálculo de rentabilidade: {e}")
-            return 50.0
+        return _profitability_kernel(_metric_value(metrics, 'roe'))
     
     def calculate_growth_score(self, metrics: Dict[str, Any], 
                              sector_benchmarks: Optional[Dict[str, float]] = None) -> float:
         """Calcula score de crescimento (0-100)"""
-        try:
-            revenue_growth = metrics.get('revenue_growth_3y', 8.0)
-            
-            if revenue_growth >= 20:
-                return 100
-            elif revenue_growth >= 15:
-                return 85 + ((revenue_growth - 15) / 5) * 15
-            elif revenue_growth >= 10:
-                return 65 + ((revenue_growth - 10) / 5) * 20
-            elif revenue_growth >= 5:
-                return 40 + ((revenue_growth - 5) / 5) * 25
-            elif revenue_growth >= 0:
-                return 20 + (revenue_growth / 5) * 20
-            else:
-                return max(0, 20 + revenue_growth * 2)
-            
-        except Exception as e:
-            self.logger.error(f"Erro no cálculo de crescimento: {e}")
-            return 50.0
+        return _growth_kernel(_metric_value(metrics, 'revenue_growth_3y'))
     
     def calculate_financial_health_score(self, metrics: Dict[str, Any], 
                                        sector_benchmarks: Optional[Dict[str, float]] = None) -> float:
         """Calcula score de saúde financeira (0-100)"""
-        try:
-            score_components = []
-            
-            # Dívida/EBITDA Score
-            debt_ebitda = metrics.get('debt_ebitda', 2.5)
-            if debt_ebitda <= 1:
-                debt_score = 100
-            elif debt_ebitda <= 2:
-                debt_score = 85 - ((debt_ebitda - 1) / 1) * 15
-            elif debt_ebitda <= 3:
-                debt_score = 60 - ((debt_ebitda - 2) / 1) * 25
-            elif debt_ebitda <= 4:
-                debt_score = 30 - ((debt_ebitda - 3) / 1) * 30
-            else:
-                debt_score = max(0, 30 - ((debt_ebitda - 4) / 2) * 30)
-            
-            score_components.append(debt_score)
-            
-            # Current Ratio Score
-            current_ratio = metrics.get('current_ratio', 1.5)
-            if current_ratio >= 2.0:
-                cr_score = 100
-            elif current_ratio >= 1.5:
-                cr_score = 80 + ((current_ratio - 1.5) / 0.5) * 20
-            elif current_ratio >= 1.2:
-                cr_score = 60 + ((current_ratio - 1.2) / 0.3) * 20
-            elif current_ratio >= 1.0:
-                cr_score = 40 + ((current_ratio - 1.0) / 0.2) * 20
-            else:
-                cr_score = (current_ratio / 1.0) * 40
-            
-            score_components.append(cr_score)
-            
-            return max(0, min(100, sum(score_components) / len(score_components)))
-            
-        except Exception as e:
-            self.logger.error(f"Erro no cálculo de saúde financeira: {e}")
-            return 50.0
+        return _financial_health_kernel(_metric_value(metrics, 'debt_ebitda'),
+                                        _metric_value(metrics, 'current_ratio'))
     
     def calculate_efficiency_score(self, metrics: Dict[str, Any], 
                                  sector_benchmarks: Optional[Dict[str, float]] = None) -> float:
         """Calcula score de eficiência (0-100)"""
-        try:
-            asset_turnover = metrics.get('asset_turnover', 0.8)
-            
-            if asset_turnover >= 1.5:
-                return 100
-            elif asset_turnover >= 1.0:
-                return 70 + ((asset_turnover - 1.0) / 0.5) * 30
-            elif asset_turnover >= 0.5:
-                return 40 + ((asset_turnover - 0.5) / 0.5) * 30
-            else:
-                return (asset_turnover / 0.5) * 40
-            
-        except Exception as e:
-            self.logger.error(f"Erro no cálculo de eficiência: {e}")
-            return 50.0
+        return _efficiency_kernel(_metric_value(metrics, 'asset_turnover'))
+    
+    # -----------------------------------------------------------------
+    # Scoring em lote (NumPy)
+    #
+    # Recebem um DataFrame (ou dict de arrays) com uma linha por ação e
+    # reproduzem as mesmas faixas dos métodos escalares. Valores ausentes
+    # devem vir como NaN e recebem o mesmo default do método escalar.
+    # -----------------------------------------------------------------
+    
+    def calculate_valuation_score_batch(self, metrics_df: Any) -> np.ndarray:
+        """Versão vetorizada de calculate_valuation_score"""
+        pe_ratio = _metric_column(metrics_df, 'pe_ratio')
+        pb_ratio = _metric_column(metrics_df, 'pb_ratio')
+        
+        # Só entram componentes positivos (NaN compara como False)
+        has_pe = pe_ratio > 0
+        has_pb = pb_ratio > 0
+        
+        pe_score = np.select(
+            [pe_ratio <= 8, pe_ratio <= 15, pe_ratio <= 25],
+            [100.0,
+             100 - (pe_ratio - 8) * _PE_SLOPE_A,
+             70 - (pe_ratio - 15) * _PE_SLOPE_B],
+            default=np.maximum(0, 20 - (pe_ratio - 25) * _PE_SLOPE_C)
+        )
+        pb_score = np.select(
+            [pb_ratio <= 0.8, pb_ratio <= 2.0, pb_ratio <= 4.0],
+            [100.0,
+             100 - (pb_ratio - 0.8) * _PB_SLOPE_A,
+             70 - (pb_ratio - 2.0) * _PB_SLOPE_B],
+            default=np.maximum(0, 20 - (pb_ratio - 4.0) * _PB_SLOPE_C)
+        )
+        
+        weighted = np.where(has_pe, pe_score * 0.4, 0.0) + np.where(has_pb, pb_score * 0.3, 0.0)
+        # Mesmo divisor do escalar: 0.4 com um componente, 0.7 com os dois
+        total_weight = np.where(has_pe & has_pb, 0.7, 0.4)
+        
+        return np.where(has_pe | has_pb, np.clip(weighted / total_weight, 0, 100), 50.0)
+    
+    def calculate_profitability_score_batch(self, metrics_df: Any) -> np.ndarray:
+        """Versão vetorizada de calculate_profitability_score"""
+        roe = _metric_column(metrics_df, 'roe')
+        
+        roe_score = np.select(
+            [roe >= 25, roe >= 20, roe >= 15, roe >= 10, roe >= 0],
+            [100.0,
+             90 + (roe - 20) * _ROE_SLOPE_A,
+             70 + (roe - 15) * _ROE_SLOPE_B,
+             40 + (roe - 10) * _ROE_SLOPE_C,
+             roe * _ROE_SLOPE_D],
+            default=0.0
+        )
+        
+        return np.where(np.isnan(roe), 50.0, np.clip(roe_score, 0, 100))
+    
+    def calculate_growth_score_batch(self, metrics_df: Any) -> np.ndarray:
+        """Versão vetorizada de calculate_growth_score"""
+        revenue_growth = _metric_column(metrics_df, 'revenue_growth_3y', 8.0)
+        
+        return np.select(
+            [revenue_growth >= 20, revenue_growth >= 15, revenue_growth >= 10,
+             revenue_growth >= 5, revenue_growth >= 0],
+            [100.0,
+             85 + (revenue_growth - 15) * _GROWTH_SLOPE_A,
+             65 + (revenue_growth - 10) * _GROWTH_SLOPE_B,
+             40 + (revenue_growth - 5) * _GROWTH_SLOPE_C,
+             20 + revenue_growth * _GROWTH_SLOPE_D],
+            default=np.maximum(0, 20 + revenue_growth * 2)
+        )
+    
+    def calculate_financial_health_score_batch(self, metrics_df: Any) -> np.ndarray:
+        """Versão vetorizada de calculate_financial_health_score"""
+        debt_ebitda = _metric_column(metrics_df, 'debt_ebitda', 2.5)
+        current_ratio = _metric_column(metrics_df, 'current_ratio', 1.5)
+        
+        debt_score = np.select(
+            [debt_ebitda <= 1, debt_ebitda <= 2, debt_ebitda <= 3, debt_ebitda <= 4],
+            [100.0,
+             85 - (debt_ebitda - 1) * _DEBT_SLOPE_A,
+             60 - (debt_ebitda - 2) * _DEBT_SLOPE_B,
+             30 - (debt_ebitda - 3) * _DEBT_SLOPE_C],
+            default=np.maximum(0, 30 - (debt_ebitda - 4) * _DEBT_SLOPE_D)
+        )
+        cr_score = np.select(
+            [current_ratio >= 2.0, current_ratio >= 1.5, current_ratio >= 1.2, current_ratio >= 1.0],
+            [100.0,
+             80 + (current_ratio - 1.5) * _CR_SLOPE_A,
+             60 + (current_ratio - 1.2) * _CR_SLOPE_B,
+             40 + (current_ratio - 1.0) * _CR_SLOPE_C],
+            default=current_ratio * _CR_SLOPE_D
+        )
+        
+        return np.clip((debt_score + cr_score) / 2, 0, 100)
+    
+    def calculate_efficiency_score_batch(self, metrics_df: Any) -> np.ndarray:
+        """Versão vetorizada de calculate_efficiency_score"""
+        asset_turnover = _metric_column(metrics_df, 'asset_turnover', 0.8)
+        
+        return np.select(
+            [asset_turnover >= 1.5, asset_turnover >= 1.0, asset_turnover >= 0.5],
+            [100.0,
+             70 + (asset_turnover - 1.0) * _TURNOVER_SLOPE_A,
+             40 + (asset_turnover - 0.5) * _TURNOVER_SLOPE_B],
+            default=asset_turnover * _TURNOVER_SLOPE_C
+        )
+    
+    def calculate_composite_score_batch(self, metrics_df: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores compostos em lote
+        
+        Retorna (composite, scores) onde scores tem shape (N, 5) com as
+        colunas na ordem de _SCORE_CATEGORIES.
+        """
+        scores = np.column_stack([
+            self.calculate_valuation_score_batch(metrics_df),
+            self.calculate_profitability_score_batch(metrics_df),
+            self.calculate_growth_score_batch(metrics_df),
+            self.calculate_financial_health_score_batch(metrics_df),
+            self.calculate_efficiency_score_batch(metrics_df)
+        ])
+        
+        return np.clip(scores @ self._weights_arr, 0, 100), scores
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=16384)
+    def _composite_cached(pe_ratio: float, pb_ratio: float, roe: float, debt_ebitda: float,
+                          current_ratio: float, revenue_growth: float, asset_turnover: float,
+                          weights_key: Tuple[float, ...]) -> Tuple[float, np.ndarray]:
+        """Score composto memoizado por métricas e pesos"""
+        composite_score, *category_scores = _composite_kernel(
+            pe_ratio, pb_ratio, roe, debt_ebitda, current_ratio,
+            revenue_growth, asset_turnover, *weights_key)
+        scores = np.array(category_scores, dtype=np.float64)
+        # Compartilhado entre chamadas pelo cache: somente leitura
+        scores.flags.writeable = False
+        return composite_score, scores
+    
+    def calculate_composite_score_array(self, metrics: Dict[str, Any]) -> Tuple[float, np.ndarray]:
+        """Score composto e vetor (5,) de scores na ordem de _SCORE_CATEGORIES
+        
+        O vetor é somente leitura (pode ser compartilhado pelo cache).
+        """
+        # Métricas exatas como chave do cache (ausentes → np.nan)
+        return self._composite_cached(
+            _metric_key(metrics, 'pe_ratio'),
+            _metric_key(metrics, 'pb_ratio'),
+            _metric_key(metrics, 'roe'),
+            _metric_key(metrics, 'debt_ebitda'),
+            _metric_key(metrics, 'current_ratio'),
+            _metric_key(metrics, 'revenue_growth_3y'),
+            _metric_key(metrics, 'asset_turnover'),
+            self._weights_key
+        )
     
     def calculate_composite_score(self, metrics: Dict[str, Any], 
                                 sector: Optional[str] = None) -> Tuple[float, Dict[str, float]]:
         """Calcula o score composto final (0-100)"""
-        try:
-            # Calcular scores individuais
-            scores = {
-                'valuation': self.calculate_valuation_score(metrics),
-                'profitability': self.calculate_profitability_score(metrics),
-                'growth': self.calculate_growth_score(metrics),
-                'financial_health': self.calculate_financial_health_score(metrics),
-                'efficiency': self.calculate_efficiency_score(metrics)
-            }
-            
-            # Score composto ponderado
-            composite_score = (
-                scores['valuation'] * self.weights.valuation +
-                scores['profitability'] * self.weights.profitability +
-                scores['growth'] * self.weights.growth +
-                scores['financial_health'] * self.weights.financial_health +
-                scores['efficiency'] * self.weights.efficiency
-            )
-            
-            # Garantir que está no range 0-100
-            composite_score = max(0, min(100, composite_score))
-            
-            return composite_score, scores
-            
-        except Exception as e:
-            self.logger.error(f"Erro no cálculo do score composto: {e}")
-            return 50.0, {'valuation': 50, 'profitability': 50, 'growth': 50, 
-                         'financial_health': 50, 'efficiency': 50}
+        composite_score, scores = self.calculate_composite_score_array(metrics)
+        return composite_score, scores_to_dict(scores)
     
     def get_quality_tier(self, score: float) -> QualityTier:
         """Determina o tier de qualidade baseado no score"""
-        if score >= 85:
-            return QualityTier.EXCELLENT
-        elif score >= 70:
-            return QualityTier.GOOD
-        elif score >= 50:
-            return QualityTier.AVERAGE
-        elif score >= 30:
-            return QualityTier.BELOW_AVERAGE
-        else:
-            return QualityTier.POOR
+        return _TIERS_ASCENDING[bisect_right(_TIER_THRESHOLDS, score)]
+    
+    def get_quality_tier_batch(self, scores: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de get_quality_tier (array de QualityTier)"""
+        # side='right' reproduz o bisect_right do caso escalar
+        indices = np.searchsorted(_TIER_BOUNDS_ARRAY, np.asarray(scores, dtype=np.float64), side='right')
+        return _TIERS_ARRAY[indices]
     
     def apply_quality_filters(self, metrics: Dict[str, Any]) -> Dict[str, bool]:
         """Aplica filtros de qualidade fundamentalista"""
-        filters = {}
+        # Métricas ausentes viram NaN (comparações com NaN são falsas)
+        roe = _metric_value(metrics, 'roe')
+        revenue_growth = _metric_value(metrics, 'revenue_growth_3y')
+        debt_ebitda = _metric_value(metrics, 'debt_ebitda')
+        net_margin = _metric_value(metrics, 'net_margin')
         
-        try:
+        filters = {
             # Filtro ROE > 15%
-            roe = metrics.get('roe')
-            filters['roe_above_15'] = roe is not None and roe >= 15.0
-            
+            'roe_above_15': roe >= 15.0,
             # Filtro crescimento sustentável
-            revenue_growth = metrics.get('revenue_growth_3y')
-            filters['sustainable_growth'] = revenue_growth is not None and revenue_growth >= 5.0
-            
-            # Filtro endividamento controlado
-            debt_ebitda = metrics.get('debt_ebitda')
-            filters['controlled_debt'] = debt_ebitda is None or debt_ebitda <= 4.0
-            
+            'sustainable_growth': revenue_growth >= 5.0,
+            # Filtro endividamento controlado (sem dado não reprova)
+            'controlled_debt': not debt_ebitda > 4.0,
             # Filtro margens estáveis
-            net_margin = metrics.get('net_margin')
-            filters['stable_margins'] = net_margin is not None and net_margin >= 5.0
-            
-            # Score geral dos filtros
-            passed_filters = sum(1 for passed in filters.values() if passed)
-            total_filters = len(filters)
-            filters['quality_score'] = (passed_filters / total_filters) * 100
-            
-            return filters
-            
-        except Exception as e:
-            self.logger.error(f"Erro na aplicação de filtros: {e}")
-            return {'quality_score': 50.0}
+            'stable_margins': net_margin >= 5.0
+        }
+        
+        # Score geral dos filtros
+        passed_filters = sum(1 for passed in filters.values() if passed)
+        filters['quality_score'] = (passed_filters / len(filters)) * 100
+        
+        return filters
     
     def identify_red_flags(self, metrics: Dict[str, Any]) -> List[str]:
         """Identifica red flags em empresas problemáticas"""
         red_flags = []
         
-        try:
-            # ROE negativo
-            roe = metrics.get('roe')
-            if roe is not None and roe < 0:
-                red_flags.append("ROE negativo")
-            
-            # Endividamento excessivo
-            debt_ebitda = metrics.get('debt_ebitda')
-            if debt_ebitda is not None and debt_ebitda > 6:
-                red_flags.append("Endividamento excessivo")
-            
-            # Margem líquida negativa
-            net_margin = metrics.get('net_margin')
-            if net_margin is not None and net_margin < 0:
-                red_flags.append("Margem líquida negativa")
-            
-            # Queda de receita
-            revenue_growth = metrics.get('revenue_growth_3y')
-            if revenue_growth is not None and revenue_growth < -10:
-                red_flags.append("Queda acentuada de receita")
-            
-            return red_flags
-            
-        except Exception as e:
-            self.logger.error(f"Erro na identificação de red flags: {e}")
-            return []
+        # ROE negativo
+        if _metric_value(metrics, 'roe') < 0:
+            red_flags.append("ROE negativo")
+        
+        # Endividamento excessivo
+        if _metric_value(metrics, 'debt_ebitda') > 6:
+            red_flags.append("Endividamento excessivo")
+        
+        # Margem líquida negativa
+        if _metric_value(metrics, 'net_margin') < 0:
+            red_flags.append("Margem líquida negativa")
+        
+        # Queda de receita
+        if _metric_value(metrics, 'revenue_growth_3y') < -10:
+            red_flags.append("Queda acentuada de receita")
+        
+        return red_flags
     
     def get_recommendation(self, score: float, quality_filters: Dict[str, bool], 
                           red_flags: List[str]) -> str:
         """Gera recomendação baseada no score e filtros"""
-        try:
-            # Se há muitos red flags, recomendação negativa
-            if len(red_flags) >= 3:
-                return "VENDA FORTE"
-            elif len(red_flags) >= 2:
-                return "VENDA"
-            
-            # Baseado no score e filtros
-            quality_score = quality_filters.get('quality_score', 50.0)
-            
-            if score >= 85 and quality_score >= 80:
-                return "COMPRA FORTE"
-            elif score >= 70 and quality_score >= 70:
-                return "COMPRA"
-            elif score >= 50 and quality_score >= 60:
-                return "NEUTRO"
-            elif score >= 30:
-                return "VENDA"
-            else:
-                return "VENDA FORTE"
-            
-        except Exception as e:
-            self.logger.error(f"Erro na geração de recomendação: {e}")
-            return "NEUTRO"
+        score = _coerce_float(score, 50.0)
+        quality_score = _coerce_float(quality_filters.get('quality_score'), 50.0)
+        
+        index = _REC_TABLE[min(len(red_flags), 3),
+                           bisect_right(_REC_SCORE_BOUNDS, score),
+                           bisect_right(_REC_QUALITY_BOUNDS, quality_score)]
+        return _RECOMMENDATIONS_ASCENDING[index]
+    
+    def get_recommendation_batch(self, scores: np.ndarray, quality_scores: np.ndarray,
+                                 red_flag_counts: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de get_recommendation (array de recomendações)"""
+        index = _REC_TABLE[
+            np.minimum(np.asarray(red_flag_counts, dtype=np.intp), 3),
+            np.searchsorted(_REC_SCORE_BOUNDS_ARRAY, scores, side='right'),
+            np.searchsorted(_REC_QUALITY_BOUNDS_ARRAY, quality_scores, side='right')
+        ]
+        return _RECOMMENDATIONS_ARRAY[index]
+    
+    @staticmethod
+    def _quality_filter_matrix(frame: MetricsFrame) -> np.ndarray:
+        """Filtros de qualidade (N, 4), colunas em _QUALITY_FILTER_NAMES"""
+        return np.column_stack([
+            frame.roe >= 15.0,
+            frame.revenue_growth_3y >= 5.0,
+            ~(frame.debt_ebitda > 4.0),
+            frame.net_margin >= 5.0
+        ])
+    
+    @staticmethod
+    def _red_flag_matrix(frame: MetricsFrame) -> np.ndarray:
+        """Red flags (N, 4), colunas em _RED_FLAG_LABELS"""
+        return np.column_stack([
+            frame.roe < 0,
+            frame.debt_ebitda > 6,
+            frame.net_margin < 0,
+            frame.revenue_growth_3y < -10
+        ])
+    
+    def apply_quality_filters_batch(self, frame: MetricsFrame) -> Dict[str, np.ndarray]:
+        """Versão vetorizada de apply_quality_filters (um array por filtro)"""
+        matrix = self._quality_filter_matrix(frame)
+        filters = {name: matrix[:, column] for column, name in enumerate(_QUALITY_FILTER_NAMES)}
+        filters['quality_score'] = matrix.mean(axis=1) * 100
+        return filters
+    
+    def identify_red_flags_batch(self, frame: MetricsFrame) -> List[List[str]]:
+        """Versão vetorizada de identify_red_flags (uma lista por ação)"""
+        matrix = self._red_flag_matrix(frame)
+        red_flags = [[] for _ in range(len(matrix))]
+        # Só as posições marcadas geram trabalho em Python
+        for row, column in zip(*np.nonzero(matrix)):
+            red_flags[row].append(_RED_FLAG_LABELS[column])
+        return red_flags
+    
+    def score_universe(self, frame: MetricsFrame) -> Dict[str, np.ndarray]:
+        """Scoring completo de um universo de ações em lote
+        
+        Retorna arrays alinhados às linhas do frame: composite, scores
+        (N, 5), quality_tier, quality_filters (N, 4), quality_score,
+        red_flags (N, 4) e recommendation.
+        """
+        composite, scores = self.calculate_composite_score_batch(frame)
+        return self._universe_result(frame, composite, scores, self.get_quality_tier_batch(composite))
+    
+    def score_universe_parallel(self, frame: MetricsFrame) -> Dict[str, np.ndarray]:
+        """score_universe com os scores calculados pelo kernel paralelo
+        
+        Com Numba as linhas são distribuídas entre os núcleos (prange);
+        o resultado equivale ao de score_universe.
+        """
+        composite, tiers, scores = _score_universe_kernel(
+            np.ascontiguousarray(frame.pe_ratio, dtype=np.float64),
+            np.ascontiguousarray(frame.pb_ratio, dtype=np.float64),
+            np.ascontiguousarray(frame.roe, dtype=np.float64),
+            np.ascontiguousarray(frame.debt_ebitda, dtype=np.float64),
+            np.ascontiguousarray(frame.current_ratio, dtype=np.float64),
+            np.ascontiguousarray(frame.revenue_growth_3y, dtype=np.float64),
+            np.ascontiguousarray(frame.asset_turnover, dtype=np.float64),
+            self._weights_arr,
+            _TIER_BOUNDS_ARRAY
+        )
+        return self._universe_result(frame, composite, scores, _TIERS_ARRAY[tiers])
+    
+    def _universe_result(self, frame: MetricsFrame, composite: np.ndarray, scores: np.ndarray,
+                         quality_tier: np.ndarray) -> Dict[str, np.ndarray]:
+        """Completa o resultado do universo com filtros, red flags e recomendação"""
+        quality_filters = self._quality_filter_matrix(frame)
+        quality_score = quality_filters.mean(axis=1) * 100
+        
+        red_flags = self._red_flag_matrix(frame)
+        
+        return {
+            'composite': composite,
+            'scores': scores,
+            'quality_tier': quality_tier,
+            'quality_filters': quality_filters,
+            'quality_score': quality_score,
+            'red_flags': red_flags,
+            'recommendation': self.get_recommendation_batch(composite, quality_score,
+                                                            red_flags.sum(axis=1))
+        }
 
 
 # =================================================================
 # AGENTE ANALISADOR ORIGINAL
 # =================================================================
 
+# Setores do yfinance -> padrão brasileiro
+_SECTOR_MAP = MappingProxyType({
+    'Technology': 'Tecnologia',
+    'Financial Services': 'Financeiro',
+    'Energy': 'Petróleo',
+    'Basic Materials': 'Mineração',
+    'Consumer Cyclical': 'Varejo',
+    'Consumer Defensive': 'Consumo',
+    'Healthcare': 'Saúde',
+    'Industrials': 'Industrial',
+    'Real Estate': 'Imobiliário',
+    'Utilities': 'Utilidades',
+    'Communication Services': 'Telecomunicações'
+})
+
+class AnalysisResult(NamedTuple):
+    """Resultado tipado de uma análise individual
+    
+    ok=False indica falha: data traz o dict de erro e error a mensagem.
+    Análises vindas do cache (cache=True) são mapeamentos somente leitura.
+    """
+    ok: bool
+    data: Mapping[str, Any]
+    error: Optional[str] = None
+
+# Validade (segundos) e limite de entradas das análises memoizadas por agente
+_ANALYSIS_CACHE_TTL = 300
+_ANALYSIS_CACHE_MAXSIZE = 512
+
+def _freeze(value: Any) -> Any:
+    """Cópia somente leitura (dicts → MappingProxyType, listas → tuplas)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Configuração padrão (somente leitura, compartilhada entre instâncias)
+_DEFAULT_CONFIG = MappingProxyType({
+    "scoring_weights": MappingProxyType({
+        "valuation": 0.25,
+        "profitability": 0.30,
+        "growth": 0.20,
+        "financial_health": 0.15,
+        "efficiency": 0.10
+    }),
+    "quality_tiers": MappingProxyType({
+        "excellent": 85,
+        "good": 70,
+        "average": 50,
+        "below_average": 30
+    })
+})
+
 class FundamentalAnalyzerAgent(Agent):
     """
     Agente Analisador Fundamentalista - Versão Corrigida
@@ -677,6 +1207,9 @@ class FundamentalAnalyzerAgent(Agent):
     dos problemas do FinancialCalculator.
     """
     
+    # Configurações já lidas no processo: caminho → (mtime, config somente leitura)
+    _CONFIG_CACHE: Dict[str, Tuple[float, Mapping[str, Any]]] = {}
+    
     def __init__(self, config_path: Optional[str] = None):
         # Configuração do Agno (se disponível)
         if AGNO_AVAILABLE:
@@ -718,9 +1251,28 @@ class FundamentalAnalyzerAgent(Agent):
         
         self.logger = logging.getLogger(__name__)
         
+        # Serializa escritas no banco quando análises rodam em paralelo
+        self._db_lock = threading.Lock()
+        
         # Configurações
         self.config = self._load_config(config_path)
         self.weights = ScoringWeights(**self.config.get('scoring_weights', {}))
+        # Limites de tier da configuração (ordem crescente, para o bisect)
+        tier_config = self.config.get('quality_tiers', {})
+        self._tier_cuts = (
+            float(tier_config.get('below_average', 30)),
+            float(tier_config.get('average', 50)),
+            float(tier_config.get('good', 70)),
+            float(tier_config.get('excellent', 85))
+        )
+        # Pesos na ordem de _SCORE_CATEGORIES (composto em lote)
+        self._weights_vec = np.array(_CATEGORY_GETTER(self.weights), dtype=np.float64)
+        # Soma ponderada especializada para os pesos fixos (composto escalar)
+        self._weighted_sum = self.weights.scorer
+        
+        # Análises memoizadas por ação (resultados imutáveis, TTL curto)
+        self._analysis_cache: Dict[str, Tuple[float, Mapping[str, Any]]] = {}
+        self._analysis_cache_lock = threading.Lock()
         
         # Componentes
         self._init_components()
@@ -728,30 +1280,26 @@ class FundamentalAnalyzerAgent(Agent):
         # Status report
         self._log_component_status()
     
-    def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
-        """Carrega configuração"""
-        if config_path and Path(config_path).exists():
+    def _load_config(self, config_path: Optional[str]) -> Mapping[str, Any]:
+        """Carrega configuração (somente leitura, compartilhada entre instâncias)"""
+        if config_path:
             try:
+                mtime = os.stat(config_path).st_mtime
+                entry = self._CONFIG_CACHE.get(config_path)
+                if entry is not None and entry[0] == mtime:
+                    return entry[1]
+                
                 with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
+                    config = _freeze(json.load(f))
+                # Uma entrada por caminho: a versão anterior do arquivo é descartada
+                self._CONFIG_CACHE[config_path] = (mtime, config)
+                return config
+            except FileNotFoundError:
+                pass
+            except (OSError, json.JSONDecodeError) as e:
                 self.logger.warning(f"Erro ao carregar config: {e}")
         
-        return {
-            "scoring_weights": {
-                "valuation": 0.25,
-                "profitability": 0.30,
-                "growth": 0.20,
-                "financial_health": 0.15,
-                "efficiency": 0.10
-            },
-            "quality_tiers": {
-                "excellent": 85,
-                "good": 70,
-                "average": 50,
-                "below_average": 30
-            }
-        }
+        return _DEFAULT_CONFIG
     
     def _init_components(self):
         """Inicializa componentes com diagnóstico"""
@@ -784,110 +1332,185 @@ class FundamentalAnalyzerAgent(Agent):
         self.logger.info(f"Agno Framework: {'✅' if AGNO_AVAILABLE else '❌'}")
         self.logger.info(f"FinancialCalculator: {'✅' if CALCULATOR_AVAILABLE else '❌'}")
         self.logger.info(f"Database: {'✅' if DATABASE_AVAILABLE else '❌'}")
-        self.logger.info(f"NumPy: {'✅' if NUMPY_AVAILABLE else '❌'}")
     
-    def analyze_single_stock(self, stock_code: str) -> Dict[str, Any]:
+    def analyze_single_stock(self, stock_code: str, cache: bool = False) -> Mapping[str, Any]:
+        """
+        Analisa uma ação específica
+        
+        Args:
+            stock_code: Código da ação (ex: PETR4)
+            cache: Reaproveita uma análise recente (somente leitura, até
+                _ANALYSIS_CACHE_TTL segundos)
+            
+        Returns:
+            Análise fundamentalista completa (dict com "error" em caso de falha)
+        """
+        return self.analyze_stock(stock_code, cache).data
+    
+    def analyze_stock(self, stock_code: str, cache: bool = False) -> AnalysisResult:
         """
         Analisa uma ação específica
         
         Args:
             stock_code: Código da ação (ex: PETR4)
+            cache: Reaproveita uma análise recente (somente leitura, até
+                _ANALYSIS_CACHE_TTL segundos)
             
         Returns:
-            Análise fundamentalista completa
+            AnalysisResult com a análise (ok=True) ou o erro (ok=False)
         """
         self.logger.info(f"🔍 Analisando {stock_code}")
+        now = datetime.now()
         
         try:
-            # 1. Buscar dados da ação
-            stock_data = self._get_stock_data(stock_code)
-            
-            # 2. Obter dados financeiros
-            financial_data = self._create_financial_data(stock_code)
-            
-            # 3. Calcular métricas COM ANÁLISE INTELIGENTE
-            if AGNO_AVAILABLE and hasattr(self, 'run'):
-                # Usar versão inteligente
-                metrics = self.calculator.calculate_all_metrics(financial_data, reasoning_agent=self)
+            if cache:
+                result = self._cached_analysis(stock_code, now)
             else:
-                # Usar versão tradicional
-                metrics = self.calculator.calculate_all_metrics(financial_data)
-            
-            # 4. Calcular scores por categoria
-            category_scores = self._calculate_category_scores(metrics)
-            
-            # 5. Score composto
-            composite_score = self._calculate_composite_score(category_scores)
-            
-            # 6. Determinar qualidade
-            quality_tier = self._determine_quality_tier(composite_score)
-            
-            # 7. Criar score fundamentalista
-            fundamental_score = FundamentalScore(
-                stock_code=stock_code,
-                sector=stock_data.get('setor', 'Desconhecido'),
-                valuation_score=category_scores['valuation'],
-                profitability_score=category_scores['profitability'],
-                growth_score=category_scores['growth'],
-                financial_health_score=category_scores['financial_health'],
-                efficiency_score=category_scores['efficiency'],
-                composite_score=composite_score,
-                sector_rank=1,  # Placeholder
-                sector_percentile=75.0,
-                overall_rank=1,
-                overall_percentile=75.0,
-                quality_tier=quality_tier,
-                analysis_date=datetime.now(),
-                data_quality=0.85  # Mock
-            )
-            
-            # 8. Gerar resultado
-            result = {
-                "stock_code": stock_code,
-                "analysis_date": datetime.now().isoformat(),
-                "fundamental_score": fundamental_score.to_dict(),
-                "detailed_metrics": self._metrics_to_dict(metrics),
-                "category_scores": category_scores,
-                "justification": self._generate_justification(fundamental_score),
-                "recommendation": self._get_recommendation(composite_score),
-                "stock_info": {
-                    "nome": stock_data.get('nome', f'Empresa {stock_code}'),
-                    "setor": stock_data.get('setor', 'Desconhecido'),
-                    "preco_atual": stock_data.get('preco_atual')
-                },
-                "system_status": {
-                    "agno_available": AGNO_AVAILABLE,
-                    "calculator_available": CALCULATOR_AVAILABLE,
-                    "database_available": DATABASE_AVAILABLE,
-                    "calculator_error": CALCULATOR_ERROR
-                }
-            }
-            
-            self.logger.info(f"✅ Análise de {stock_code} concluída. Score: {composite_score:.1f}")
-            return result
+                result = self._compute_analysis(stock_code, now)
+            return AnalysisResult(True, result)
             
         except Exception as e:
-            error_msg = f"Erro na análise de {stock_code}: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                "error": error_msg,
-                "stock_code": stock_code,
-                "analysis_date": datetime.now().isoformat(),
-                "system_status": {
-                    "agno_available": AGNO_AVAILABLE,
-                    "calculator_available": CALCULATOR_AVAILABLE,
-                    "database_available": DATABASE_AVAILABLE
-                }
+            error = self._analysis_error(stock_code, e, now)
+            return AnalysisResult(False, error, error["error"])
+    
+    def clear_analysis_cache(self) -> None:
+        """Descarta as análises memoizadas (ex.: após atualizar o banco)"""
+        with self._analysis_cache_lock:
+            self._analysis_cache.clear()
+    
+    def _cached_analysis(self, stock_code: str, now: datetime) -> Mapping[str, Any]:
+        """Análise memoizada por _ANALYSIS_CACHE_TTL segundos
+        
+        O resultado é somente leitura e compartilhado entre chamadas, sem
+        cópia. Erros propagam e não são memoizados.
+        """
+        current = time.monotonic()
+        entry = self._analysis_cache.get(stock_code)
+        if entry is not None and current - entry[0] < _ANALYSIS_CACHE_TTL:
+            return entry[1]
+        
+        result = _freeze(self._compute_analysis(stock_code, now))
+        with self._analysis_cache_lock:
+            # Reinsere no fim: a ordem do dict é a ordem de atualização
+            self._analysis_cache.pop(stock_code, None)
+            if len(self._analysis_cache) >= _ANALYSIS_CACHE_MAXSIZE:
+                self._analysis_cache.pop(next(iter(self._analysis_cache)))
+            self._analysis_cache[stock_code] = (current, result)
+        return result
+    
+    def _compute_analysis(self, stock_code: str, now: datetime) -> Dict[str, Any]:
+        """Executa a análise completa de uma ação"""
+        # 1-3. Dados da ação e métricas
+        stock_data, metrics = self._collect_analysis_inputs(stock_code)
+        
+        # 4. Calcular scores por categoria
+        category_scores = self._calculate_category_scores(metrics)
+        
+        # 5. Score composto
+        composite_score = self._calculate_composite_score(category_scores)
+        
+        return self._build_analysis_result(stock_code, stock_data, metrics,
+                                           category_scores, composite_score, now)
+    
+    def _collect_analysis_inputs(self, stock_code: str,
+                                 stock_data: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Any]:
+        """Busca dados da ação (se não informados) e calcula as métricas
+        
+        O cálculo pode chamar self.run (agente Agno, não thread-safe):
+        executar sempre na thread do chamador.
+        """
+        # 1. Buscar dados da ação
+        if stock_data is None:
+            stock_data = self._get_stock_data(stock_code)
+        
+        # 2. Obter dados financeiros
+        financial_data = self._create_financial_data(stock_code, stock_data)
+        
+        # 3. Calcular métricas COM ANÁLISE INTELIGENTE
+        if AGNO_AVAILABLE and hasattr(self, 'run'):
+            # Usar versão inteligente
+            metrics = self.calculator.calculate_all_metrics(financial_data, reasoning_agent=self)
+        else:
+            # Usar versão tradicional
+            metrics = self.calculator.calculate_all_metrics(financial_data)
+        
+        return stock_data, metrics
+    
+    def _build_analysis_result(self, stock_code: str, stock_data: Dict[str, Any], metrics: Any,
+                               category_scores: Dict[str, float], composite_score: float,
+                               now: datetime) -> Dict[str, Any]:
+        """Monta o resultado da análise a partir dos scores calculados"""
+        # 6. Determinar qualidade
+        quality_tier = self._determine_quality_tier(composite_score)
+        
+        # 7. Criar score fundamentalista
+        fundamental_score = FundamentalScore(
+            stock_code=stock_code,
+            sector=stock_data.get('setor', 'Desconhecido'),
+            valuation_score=category_scores['valuation'],
+            profitability_score=category_scores['profitability'],
+            growth_score=category_scores['growth'],
+            financial_health_score=category_scores['financial_health'],
+            efficiency_score=category_scores['efficiency'],
+            composite_score=composite_score,
+            sector_rank=1,  # Placeholder
+            sector_percentile=75.0,
+            overall_rank=1,
+            overall_percentile=75.0,
+            quality_tier=quality_tier,
+            analysis_date=now,
+            data_quality=0.85  # Mock
+        )
+        
+        # 8. Gerar resultado
+        result = {
+            "stock_code": stock_code,
+            "analysis_date": now.isoformat(),
+            "fundamental_score": fundamental_score.to_dict(),
+            "detailed_metrics": self._metrics_to_dict(metrics),
+            "category_scores": category_scores,
+            "justification": self._generate_justification(fundamental_score),
+            "recommendation": self._get_recommendation(composite_score),
+            "stock_info": {
+                "nome": stock_data.get('nome', f'Empresa {stock_code}'),
+                "setor": stock_data.get('setor', 'Desconhecido'),
+                "preco_atual": stock_data.get('preco_atual')
+            },
+            "system_status": {
+                "agno_available": AGNO_AVAILABLE,
+                "calculator_available": CALCULATOR_AVAILABLE,
+                "database_available": DATABASE_AVAILABLE,
+                "calculator_error": CALCULATOR_ERROR
             }
+        }
+        
+        self.logger.info(f"✅ Análise de {stock_code} concluída. Score: {composite_score:.1f}")
+        return result
+    
+    def _analysis_error(self, stock_code: str, error: Exception, now: datetime) -> Dict[str, Any]:
+        """Resultado de erro de uma análise"""
+        error_msg = f"Erro na análise de {stock_code}: {str(error)}"
+        self.logger.error(error_msg)
+        return {
+            "error": error_msg,
+            "stock_code": stock_code,
+            "analysis_date": now.isoformat(),
+            "system_status": {
+                "agno_available": AGNO_AVAILABLE,
+                "calculator_available": CALCULATOR_AVAILABLE,
+                "database_available": DATABASE_AVAILABLE
+            }
+        }
         
     # ADICIONAR novo método:
     async def analyze_single_stock_with_reasoning(self, stock_code: str) -> Dict[str, Any]:
         """Análise fundamentalista com ReasoningTools para validação"""
         
-        # 1. Executar análise base (mantém compatibilidade)
-        base_analysis = self.analyze_single_stock(stock_code)
+        # 1. Executar análise base (I/O bloqueante fora do event loop)
+        analysis = await asyncio.to_thread(self.analyze_stock, stock_code)
+        base_analysis = analysis.data
         
-        if "error" in base_analysis:
+        if not analysis.ok:
             return base_analysis
         
         # 2. Se Agno disponível, usar Claude + ReasoningTools
@@ -905,7 +1528,7 @@ class FundamentalAnalyzerAgent(Agent):
                 - Setor: {base_analysis.get('sector', 'Desconhecido')}
                 
                 MÉTRICAS DETALHADAS:
-                {json.dumps(base_analysis.get('metrics_summary', {}), indent=2)}
+                {_json_indented(base_analysis.get('metrics_summary', {}))}
                 
                 VALIDAÇÃO REQUERIDA:
                 1. O score de {score:.1f} é coerente com as métricas apresentadas?
@@ -950,8 +1573,7 @@ class FundamentalAnalyzerAgent(Agent):
 
     def _extract_confidence(self, validation_text: str) -> float:
         """Extrai nível de confiança da análise"""
-        import re
-        confidence_match = re.search(r'confiança[:\s]+(\d+)', validation_text, re.IGNORECASE)
+        confidence_match = _CONFIDENCE_RE.search(validation_text)
         if confidence_match:
             return float(confidence_match.group(1))
         return 75.0  # Default
@@ -959,25 +1581,59 @@ class FundamentalAnalyzerAgent(Agent):
     def get_top_stocks(self, limit: int = 10) -> Dict[str, Any]:
         """Retorna as melhores ações baseado no score"""
         self.logger.info(f"🏆 Buscando top {limit} ações")
+        # Um único timestamp para todo o lote
+        now = datetime.now()
         
         try:
             # Ações para análise
             test_stocks = ["PETR4", "VALE3", "ITUB4", "BBDC4", "ABEV3", "MGLU3", "WEGE3", "LREN3"]
             
-            analyzed_stocks = []
-            for stock in test_stocks[:min(limit * 2, len(test_stocks))]:
+            selected_stocks = test_stocks[:min(limit * 2, len(test_stocks))]
+            
+            # Apenas a busca de dados (I/O de yfinance/banco) roda em paralelo
+            fetched = []
+            with ThreadPoolExecutor(max_workers=max(1, min(16, len(selected_stocks)))) as executor:
+                futures = [(stock, executor.submit(self._get_stock_data, stock))
+                           for stock in selected_stocks]
+                
+                # Resultados na ordem original (desempate estável na ordenação)
+                for stock, future in futures:
+                    try:
+                        fetched.append((stock, future.result()))
+                    except Exception as e:
+                        self.logger.error(f"Erro na análise de {stock}: {e}")
+            
+            # Métricas chamam o agente (self.run), que não é thread-safe: em série
+            collected = []
+            for stock, stock_data in fetched:
                 try:
-                    result = self.analyze_single_stock(stock)
-                    if "error" not in result:
-                        analyzed_stocks.append(result)
+                    collected.append((stock, *self._collect_analysis_inputs(stock, stock_data)))
                 except Exception as e:
-                    self.logger.warning(f"Erro na análise de {stock}: {e}")
+                    self.logger.error(f"Erro na análise de {stock}: {e}")
             
-            # Ordenar por score
-            analyzed_stocks.sort(
-                key=lambda x: x["fundamental_score"]["composite_score"], 
-                reverse=True
-            )
+            # Scores de todas as ações numa única passada vetorizada, com uma
+            # coluna (array) por métrica. Só o scoring é em lote: as métricas
+            # acima seguem por ação, em série. NaN recebe os mesmos fallbacks
+            # de _calculate_category_scores.
+            analyzed_stocks = []
+            if collected:
+                n = len(collected)
+                inputs = [self._category_inputs(metrics) for _, _, metrics in collected]
+                pe_ratios = np.fromiter((pe for pe, _ in inputs), dtype=np.float64, count=n)
+                roes = np.fromiter((roe for _, roe in inputs), dtype=np.float64, count=n)
+                scores_matrix = self._calculate_category_scores_batch(pe_ratios, roes)
+                composites = scores_matrix @ self._weights_vec
+                
+                # Ordem decrescente de score (estável: empates mantêm a ordem original);
+                # resultados por ação só são montados já na ordem do ranking
+                for i in np.argsort(-composites, kind='stable').tolist():
+                    stock, stock_data, metrics = collected[i]
+                    try:
+                        analyzed_stocks.append(self._build_analysis_result(
+                            stock, stock_data, metrics,
+                            scores_to_dict(scores_matrix[i]), float(composites[i]), now))
+                    except Exception as e:
+                        self.logger.warning(f"Erro na análise de {stock}: {e}")
             
             # Atualizar rankings
             for i, stock in enumerate(analyzed_stocks):
@@ -985,15 +1641,17 @@ class FundamentalAnalyzerAgent(Agent):
                 stock["fundamental_score"]["overall_percentile"] = ((len(analyzed_stocks) - i) / len(analyzed_stocks)) * 100
             
             top_stocks = analyzed_stocks[:limit]
+            # Poucos valores: soma em Python puro evita a conversão para ndarray
+            composite_scores = [s["fundamental_score"]["composite_score"] for s in analyzed_stocks]
             
             return {
-                "analysis_date": datetime.now().isoformat(),
+                "analysis_date": now.isoformat(),
                 "total_analyzed": len(analyzed_stocks),
                 "top_stocks_count": len(top_stocks),
                 "top_stocks": top_stocks,
                 "summary": {
                     "best_score": top_stocks[0]["fundamental_score"]["composite_score"] if top_stocks else 0,
-                    "average_score": np.mean([s["fundamental_score"]["composite_score"] for s in analyzed_stocks]) if analyzed_stocks else 0,
+                    "average_score": sum(composite_scores) / len(composite_scores) if composite_scores else 0,
                     "sectors_represented": len(set(s["stock_info"]["setor"] for s in top_stocks))
                 },
                 "system_status": {
@@ -1008,7 +1666,7 @@ class FundamentalAnalyzerAgent(Agent):
             self.logger.error(error_msg)
             return {
                 "error": error_msg,
-                "analysis_date": datetime.now().isoformat()
+                "analysis_date": now.isoformat()
             }
     
     # ====== MÉTODOS AUXILIARES ======
@@ -1058,19 +1716,15 @@ class FundamentalAnalyzerAgent(Agent):
         
         try:
             # Tentar yfinance primeiro (gratuito e confiável)
-            ticker_symbol = f"{stock_code}.SA"  # Formato B3
-            ticker = yf.Ticker(ticker_symbol)
-            
-            # Obter informações básicas
-            info = ticker.info
+            info, financials, balance_sheet = _fetch_yf(stock_code, int(time.time() // _YF_CACHE_TTL))
             
             if not info or 'marketCap' not in info:
                 self.logger.warning(f"Dados insuficientes no yfinance para {stock_code}")
                 return self._try_alternative_sources(stock_code)
             
-            # Obter demonstrações financeiras
-            financials = ticker.financials
-            balance_sheet = ticker.balance_sheet
+            # Coluna mais recente materializada uma vez por ticker
+            fin_dict = _latest_column(financials)
+            bs_dict = _latest_column(balance_sheet)
             
             # Extrair dados fundamentais REAIS
             real_data = {
@@ -1082,11 +1736,11 @@ class FundamentalAnalyzerAgent(Agent):
                 'volume_medio': info.get('averageVolume', 0),
                 
                 # Dados financeiros REAIS
-                'revenue': self._get_financial_metric(financials, 'Total Revenue'),
-                'net_income': self._get_financial_metric(financials, 'Net Income'),
-                'total_assets': self._get_balance_metric(balance_sheet, 'Total Assets'),
-                'total_equity': self._get_balance_metric(balance_sheet, 'Total Equity Gross Minority Interest'),
-                'total_debt': self._get_balance_metric(balance_sheet, 'Total Debt'),
+                'revenue': _pick(fin_dict, 'Total Revenue'),
+                'net_income': _pick(fin_dict, 'Net Income'),
+                'total_assets': _pick(bs_dict, 'Total Assets'),
+                'total_equity': _pick(bs_dict, 'Total Equity Gross Minority Interest'),
+                'total_debt': _pick(bs_dict, 'Total Debt'),
                 
                 # Métricas calculadas REAIS
                 'roe': info.get('returnOnEquity', 0) * 100 if info.get('returnOnEquity') else 0,
@@ -1094,7 +1748,7 @@ class FundamentalAnalyzerAgent(Agent):
                 'net_margin': info.get('profitMargins', 0) * 100 if info.get('profitMargins') else 0,
                 'pe_ratio': info.get('forwardPE', info.get('trailingPE', 0)),
                 'pb_ratio': info.get('priceToBook', 0),
-                'debt_to_equity': self._calculate_debt_to_equity(balance_sheet),
+                'debt_to_equity': self._calculate_debt_to_equity(bs_dict),
                 
                 # Metadados
                 'data_source': 'yfinance',
@@ -1114,44 +1768,14 @@ class FundamentalAnalyzerAgent(Agent):
             self.logger.error(f"Erro buscando dados reais para {stock_code}: {e}")
             return self._try_alternative_sources(stock_code)
         
-    def _get_financial_metric(self, financials, metric_name: str) -> float:
-        """Extrai métrica financeira das demonstrações"""
-        
-        try:
-            if financials is not None and not financials.empty:
-                if metric_name in financials.index:
-                    # Pegar valor mais recente (primeira coluna)
-                    value = financials.loc[metric_name].iloc[0]
-                    return float(value) if pd.notna(value) else 0
-        except Exception as e:
-            self.logger.debug(f"Erro extraindo {metric_name}: {e}")
-        
-        return 0
-    
-    def _get_balance_metric(self, balance_sheet, metric_name: str) -> float:
-        """Extrai métrica do balanço patrimonial"""
-        
-        try:
-            if balance_sheet is not None and not balance_sheet.empty:
-                if metric_name in balance_sheet.index:
-                    value = balance_sheet.loc[metric_name].iloc[0]
-                    return float(value) if pd.notna(value) else 0
-        except Exception as e:
-            self.logger.debug(f"Erro extraindo {metric_name}: {e}")
-        
-        return 0
-    
-    def _calculate_debt_to_equity(self, balance_sheet) -> float:
+    def _calculate_debt_to_equity(self, bs_dict: Dict[str, Any]) -> float:
         """Calcula debt-to-equity ratio dos dados reais"""
         
-        try:
-            total_debt = self._get_balance_metric(balance_sheet, 'Total Debt')
-            total_equity = self._get_balance_metric(balance_sheet, 'Total Equity Gross Minority Interest')
-            
-            if total_equity > 0:
-                return total_debt / total_equity
-        except Exception:
-            pass
+        total_debt = _pick(bs_dict, 'Total Debt')
+        total_equity = _pick(bs_dict, 'Total Equity Gross Minority Interest')
+        
+        if total_equity > 0:
+            return total_debt / total_equity
         
         return 0
 
@@ -1184,17 +1808,18 @@ class FundamentalAnalyzerAgent(Agent):
             return False
         
         try:
-            # Verificar se já existe
-            existing_stock = self.stock_repo.get_stock_by_code(stock_code)
-            
-            if existing_stock:
-                # Atualizar dados existentes
-                self.logger.info(f"📝 Atualizando {stock_code} no banco")
-                success = self.stock_repo.update_stock_data(stock_code, data)
-            else:
-                # Criar nova entrada
-                self.logger.info(f"➕ Adicionando {stock_code} ao banco")
-                success = self.stock_repo.create_stock(data)
+            # Verificar e gravar sob lock: o repositório não é thread-safe
+            with self._db_lock:
+                existing_stock = self.stock_repo.get_stock_by_code(stock_code)
+                
+                if existing_stock:
+                    # Atualizar dados existentes
+                    self.logger.info(f"📝 Atualizando {stock_code} no banco")
+                    success = self.stock_repo.update_stock_data(stock_code, data)
+                else:
+                    # Criar nova entrada
+                    self.logger.info(f"➕ Adicionando {stock_code} ao banco")
+                    success = self.stock_repo.create_stock(data)
             
             if success:
                 self.logger.info(f"✅ {stock_code} salvo no banco com dados reais")
@@ -1211,8 +1836,13 @@ class FundamentalAnalyzerAgent(Agent):
         """Verifica se os dados no banco ainda estão frescos"""
         
         try:
-            if hasattr(stock, 'data_atualizacao') and stock.data_atualizacao:
-                last_update = datetime.fromisoformat(stock.data_atualizacao.replace('Z', '+00:00'))
+            last_update = getattr(stock, 'data_atualizacao', None)
+            if last_update:
+                # Colunas DateTime já chegam como datetime; só strings são parseadas
+                if isinstance(last_update, str):
+                    last_update = datetime.fromisoformat(
+                        last_update[:-1] if last_update.endswith('Z') else last_update
+                    )
                 age = datetime.now() - last_update.replace(tzinfo=None)
                 
                 # Considerar dados frescos se atualizados nas últimas 24 horas
@@ -1236,28 +1866,16 @@ class FundamentalAnalyzerAgent(Agent):
 
     def _normalize_sector(self, sector: str) -> str:
         """Normaliza nome do setor para padrão brasileiro"""
+        return _SECTOR_MAP.get(sector, sector)
         
-        sector_mapping = {
-            'Technology': 'Tecnologia',
-            'Financial Services': 'Financeiro',
-            'Energy': 'Petróleo',
-            'Basic Materials': 'Mineração',
-            'Consumer Cyclical': 'Varejo',
-            'Consumer Defensive': 'Consumo',
-            'Healthcare': 'Saúde',
-            'Industrials': 'Industrial',
-            'Real Estate': 'Imobiliário',
-            'Utilities': 'Utilidades',
-            'Communication Services': 'Telecomunicações'
-        }
-        
-        return sector_mapping.get(sector, sector)
-        
-    def _create_financial_data(self, stock_code: str) -> FinancialData:
+    def _create_financial_data(self, stock_code: str,
+                               stock_data: Optional[Dict[str, Any]] = None) -> FinancialData:
         """Cria FinancialData com dados REAIS do banco"""
-        try:
+        # Busca única: o fallback reaproveita os mesmos dados (erros propagam)
+        if stock_data is None:
             stock_data = self._get_stock_data(stock_code)
-            
+        
+        try:
             # USAR DADOS REAIS DO BANCO (não fallback!)
             financial_data = FinancialData(
                 symbol=stock_code,
@@ -1279,12 +1897,9 @@ class FundamentalAnalyzerAgent(Agent):
             return financial_data
             
         except Exception as e:
-            self.logger.error(f"Erro criando FinancialData para {stock_code}: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"Erro criando FinancialData para {stock_code}: {e}")
             
             # Se falhar, pelo menos usar alguns dados reais
-            stock_data = self._get_stock_data(stock_code)
             return FinancialData(
                 symbol=stock_code,
                 market_cap=stock_data.get('market_cap', 50000000000),
@@ -1299,17 +1914,18 @@ class FundamentalAnalyzerAgent(Agent):
         scores = {}
         
         try:
+            # Mesmas entradas do lote: None, NaN e inválidos viram NaN
+            pe, roe = self._category_inputs(metrics)
+            if math.isnan(pe) or math.isnan(roe):
+                # Mesma regra do kernel em lote: métrica ausente usa o fallback
+                raise ValueError(f"Métrica inválida (P/L={pe}, ROE={roe})")
             
-            metrics_dict = metrics.__dict__() if hasattr(metrics, '__dict__') and callable(metrics.__dict__) else metrics.__dict__
             # Valuation (menor P/L é melhor)
-            pe = metrics_dict.get('pe_ratio', 15)
-            
             valuation_score = max(0, min(100, 100 - (pe - 10) * 3))
             
             scores['valuation'] = valuation_score
             
             # Rentabilidade (maior ROE é melhor)
-            roe = metrics_dict.get('roe', 15)
             profitability_score = max(0, min(100, roe * 4))
             scores['profitability'] = profitability_score
             
@@ -1330,85 +1946,62 @@ class FundamentalAnalyzerAgent(Agent):
         
         return scores
     
+    def _category_inputs(self, metrics) -> Tuple[float, float]:
+        """(P/L, ROE) de _calculate_category_scores para o cálculo em lote
+        
+        Ausentes recebem os mesmos defaults; None, NaN ou valores inválidos
+        viram NaN, que nos dois caminhos leva aos scores fallback.
+        """
+        pe, roe = _pe_roe(metrics)
+        return _coerce_float(pe), _coerce_float(roe)
+    
+    def _calculate_category_scores_batch(self, pe_ratio: np.ndarray, roe: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de _calculate_category_scores
+        
+        Recebe as colunas de P/L e ROE (N,); retorna (N, 5) na ordem de
+        _SCORE_CATEGORIES. Ações com métrica inválida (NaN) recebem os
+        scores fallback do escalar.
+        """
+        return _category_scores_kernel(np.ascontiguousarray(pe_ratio, dtype=np.float64),
+                                       np.ascontiguousarray(roe, dtype=np.float64))
+    
     def _calculate_composite_score(self, category_scores: Dict[str, float]) -> float:
         """Calcula score composto"""
-        return (
-            category_scores.get('valuation', 50.0) * self.weights.valuation +
-            category_scores.get('profitability', 50.0) * self.weights.profitability +
-            category_scores.get('growth', 50.0) * self.weights.growth +
-            category_scores.get('financial_health', 50.0) * self.weights.financial_health +
-            category_scores.get('efficiency', 50.0) * self.weights.efficiency
+        return self._weighted_sum(
+            category_scores.get('valuation', 50.0),
+            category_scores.get('profitability', 50.0),
+            category_scores.get('growth', 50.0),
+            category_scores.get('financial_health', 50.0),
+            category_scores.get('efficiency', 50.0)
         )
     
     def _determine_quality_tier(self, score: float) -> QualityTier:
         """Determina tier de qualidade"""
-        thresholds = self.config.get('quality_tiers', {})
-        
-        if score >= thresholds.get('excellent', 85):
-            return QualityTier.EXCELLENT
-        elif score >= thresholds.get('good', 70):
-            return QualityTier.GOOD
-        elif score >= thresholds.get('average', 50):
-            return QualityTier.AVERAGE
-        elif score >= thresholds.get('below_average', 30):
-            return QualityTier.BELOW_AVERAGE
-        else:
-            return QualityTier.POOR
+        return _TIERS_ASCENDING[bisect_right(self._tier_cuts, score)]
     
     def _metrics_to_dict(self, metrics) -> Dict[str, Any]:
         """Converte métricas para dicionário"""
-        if hasattr(metrics, '__dict__'):
-            if callable(metrics.__dict__):
-                return metrics.__dict__()
-            else:
-                return metrics.__dict__
-        else:
-            return {}
+        return {name: getattr(metrics, name) for name in _metric_fields(type(metrics))}
     
     def _generate_justification(self, score: FundamentalScore) -> str:
         """Gera justificativa da análise"""
-        tier_names = {
-            QualityTier.EXCELLENT: "EMPRESA EXCELENTE",
-            QualityTier.GOOD: "EMPRESA BOA",
-            QualityTier.AVERAGE: "EMPRESA MEDIANA",
-            QualityTier.BELOW_AVERAGE: "EMPRESA FRACA",
-            QualityTier.POOR: "EMPRESA PROBLEMÁTICA"
-        }
-        
-        tier_name = tier_names.get(score.quality_tier, "EMPRESA")
-        
-        return f"""
-{tier_name} (Score: {score.composite_score:.1f}/100)
-
-ANÁLISE FUNDAMENTALISTA:
-• Valuation: {score.valuation_score:.1f}/100
-• Rentabilidade: {score.profitability_score:.1f}/100  
-• Crescimento: {score.growth_score:.1f}/100
-• Saúde Financeira: {score.financial_health_score:.1f}/100
-• Eficiência: {score.efficiency_score:.1f}/100
-
-QUALIDADE: {score.quality_tier.value.title()}
-SETOR: {score.sector}
-DATA: {score.analysis_date.strftime('%d/%m/%Y %H:%M')}
-
-STATUS DO SISTEMA:
-• FinancialCalculator: {'✅ Real' if CALCULATOR_AVAILABLE else '⚠️  Mock'}
-• Database: {'✅ Conectado' if DATABASE_AVAILABLE else '⚠️  Mock'}
-• Agno Framework: {'✅ Ativo' if AGNO_AVAILABLE else '⚠️  Inativo'}
-        """.strip()
+        quality_tier = score.quality_tier
+        return _JUSTIFICATION_TEMPLATE.format_map({
+            'tier_name': _TIER_NAMES.get(quality_tier, "EMPRESA"),
+            'composite_score': score.composite_score,
+            'valuation_score': score.valuation_score,
+            'profitability_score': score.profitability_score,
+            'growth_score': score.growth_score,
+            'financial_health_score': score.financial_health_score,
+            'efficiency_score': score.efficiency_score,
+            'tier_title': _TIER_TITLE[quality_tier],
+            'sector': score.sector,
+            'analysis_date': score.analysis_date
+        })
     
     def _get_recommendation(self, score: float) -> str:
         """Gera recomendação"""
-        if score >= 80:
-            return "COMPRA FORTE"
-        elif score >= 65:
-            return "COMPRA"
-        elif score >= 45:
-            return "NEUTRO"
-        elif score >= 30:
-            return "VENDA"
-        else:
-            return "VENDA FORTE"
+        return _RECOMMENDATIONS_ASCENDING[bisect_right(_RECOMMENDATION_THRESHOLDS, score)]
 
 # =================================================================
 # 5. FUNÇÕES DE DIAGNÓSTICO E TESTE
@@ -1426,7 +2019,6 @@ def run_diagnostics():
     print(f"• Agno: {'✅' if AGNO_AVAILABLE else '❌'}")
     print(f"• FinancialCalculator: {'✅' if CALCULATOR_AVAILABLE else '❌'}")
     print(f"• Database: {'✅' if DATABASE_AVAILABLE else '❌'}")
-    print(f"• NumPy: {'✅' if NUMPY_AVAILABLE else '❌'}")
 
 def test_corrected_system():
     """Testa sistema corrigido"""
@@ -1439,12 +2031,14 @@ def test_corrected_system():
         print("✅ Agente criado com sucesso")
         
         # Teste de análise individual
-        result = agent.analyze_single_stock("PETR4")
+        analysis = agent.analyze_stock("PETR4")
         
-        if "error" in result:
-            print(f"❌ Erro na análise: {result['error']}")
+        if not analysis.ok:
+            print(f"❌ Erro na análise: {analysis.error}")
             return False
         
+        result = analysis.data
+        
         score = result["fundamental_score"]["composite_score"]
         recommendation = result["recommendation"]
         print(f"✅ PETR4: Score {score:.1f} - {recommendation}")
@@ -1455,6 +2049,18 @@ def test_corrected_system():
         if "error" not in top_result:
             print(f"✅ Top stocks: {top_result['top_stocks_count']} ações")
         
+        # Escalar e lote devem concordar, inclusive com P/L/ROE ausentes (NaN)
+        cases = [(12.0, 18.0), (float('nan'), 18.0), (12.0, float('nan')), (None, 18.0)]
+        batch = agent._calculate_category_scores_batch(
+            np.array([_coerce_float(pe) for pe, _ in cases], dtype=np.float64),
+            np.array([_coerce_float(roe) for _, roe in cases], dtype=np.float64))
+        for (pe, roe), row in zip(cases, batch):
+            scalar = agent._calculate_category_scores(SimpleNamespace(pe_ratio=pe, roe=roe))
+            if not np.allclose([scalar[name] for name in _SCORE_CATEGORIES], row):
+                print(f"❌ Scores escalar/lote divergem para P/L={pe}, ROE={roe}")
+                return False
+        print("✅ Scores por categoria: escalar e lote consistentes")
+        
         return True
         
     except Exception as e:
@@ -0,0 +1,366 @@
+# agents/analyzers/score_kernels.py
+"""
+Kernels Numéricos de Scoring
+Núcleo numérico dos analisadores compilado com Numba quando disponível
+
+Sem Numba as funções continuam válidas em Python puro.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback: retorna a função sem compilação"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit("float64(float64, float64, float64)", cache=True)
+def score_adjust(base: float, roe: float, pe_ratio: float) -> float:
+    """Ajusta o score base por ROE e P/L, limitado a 0-100"""
+    score = base
+
+    # Ajuste baseado em ROE (maior é melhor)
+    if roe > 25:
+        score += 10
+    elif roe > 20:
+        score += 5
+    elif roe < 10:
+        score -= 10
+
+    # Ajuste baseado em P/L (menor é melhor, até certo ponto)
+    if 8 <= pe_ratio <= 12:
+        score += 5
+    elif pe_ratio > 20:
+        score -= 5
+
+    return max(0.0, min(100.0, score))
+
+
+@njit("float64[:](float64[:], float64[:], float64[:])", cache=True, parallel=True)
+def score_adjust_batch(base, roe, pe_ratio):
+    """Versão em lote de score_adjust (paralela com Numba)"""
+    n = base.shape[0]
+    scores = np.empty(n, dtype=np.float64)
+    for i in prange(n):
+        scores[i] = score_adjust(base[i], roe[i], pe_ratio[i])
+    return scores
+
+
+@njit("float64[:](uint8[:], int64[:])", cache=True)
+def fnv1a_mod40(buffer, offsets):
+    """Score fallback (40-79) via FNV-1a 32 bits dos códigos concatenados
+
+    buffer contém os bytes UTF-8 de todos os códigos e offsets delimita
+    cada código (len(offsets) == n + 1).
+    """
+    n = offsets.shape[0] - 1
+    scores = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        h = 2166136261
+        for j in range(offsets[i], offsets[i + 1]):
+            h = ((h ^ int(buffer[j])) * 16777619) & 0xFFFFFFFF
+        scores[i] = 40.0 + (h % 40)
+    return scores
+
+
+def encode_codes(codes):
+    """Codifica os códigos num buffer uint8 contíguo com offsets"""
+    encoded = [code.encode('utf-8') for code in codes]
+    # bytearray mantém o buffer gravável (exigido pela assinatura uint8[:])
+    buffer = np.frombuffer(bytearray(b''.join(encoded)), dtype=np.uint8)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(code) for code in encoded], dtype=np.int64)
+    return buffer, offsets
+
+
+def fallback_scores(codes):
+    """Scores fallback determinísticos para vários códigos"""
+    return fnv1a_mod40(*encode_codes(codes))
+
+
+def fallback_score(code: str) -> float:
+    """Score fallback determinístico de um código"""
+    return float(fallback_scores([code])[0])
+
+
+# =================================================================
+# Faixas do ScoringEngine (fundamental_scoring_system)
+#
+# NaN indica métrica ausente: P/L, P/VP e ROE ausentes ficam fora do
+# cálculo; as demais recebem o mesmo default do ScoringEngine.
+# Sem fastmath: as checagens de NaN precisam ser preservadas.
+# =================================================================
+
+# Inclinações das faixas pré-calculadas (multiplicação no lugar de divisão)
+_PE_SLOPE_A = 30.0 / 7.0
+_PE_SLOPE_B = 50.0 / 10.0
+_PE_SLOPE_C = 20.0 / 10.0
+
+_PB_SLOPE_A = 30.0 / 1.2
+_PB_SLOPE_B = 50.0 / 2.0
+_PB_SLOPE_C = 20.0 / 2.0
+
+_ROE_SLOPE_A = 10.0 / 5.0
+_ROE_SLOPE_B = 20.0 / 5.0
+_ROE_SLOPE_C = 30.0 / 5.0
+_ROE_SLOPE_D = 40.0 / 10.0
+
+_DEBT_SLOPE_A = 15.0 / 1.0
+_DEBT_SLOPE_B = 25.0 / 1.0
+_DEBT_SLOPE_C = 30.0 / 1.0
+_DEBT_SLOPE_D = 30.0 / 2.0
+
+_CR_SLOPE_A = 20.0 / 0.5
+_CR_SLOPE_B = 20.0 / 0.3
+_CR_SLOPE_C = 20.0 / 0.2
+_CR_SLOPE_D = 40.0 / 1.0
+
+_GROWTH_SLOPE_A = 15.0 / 5.0
+_GROWTH_SLOPE_B = 20.0 / 5.0
+_GROWTH_SLOPE_C = 25.0 / 5.0
+_GROWTH_SLOPE_D = 20.0 / 5.0
+
+_TURNOVER_SLOPE_A = 30.0 / 0.5
+_TURNOVER_SLOPE_B = 30.0 / 0.5
+_TURNOVER_SLOPE_C = 40.0 / 0.5
+
+
+@njit("float64(float64)", cache=True)
+def pe_score(pe_ratio: float) -> float:
+    """Score do P/L (menor é melhor)"""
+    if pe_ratio <= 8:
+        return 100.0
+    elif pe_ratio <= 15:
+        return 100 - (pe_ratio - 8) * _PE_SLOPE_A
+    elif pe_ratio <= 25:
+        return 70 - (pe_ratio - 15) * _PE_SLOPE_B
+    return max(0.0, 20 - (pe_ratio - 25) * _PE_SLOPE_C)
+
+
+@njit("float64(float64)", cache=True)
+def pb_score(pb_ratio: float) -> float:
+    """Score do P/VP (menor é melhor)"""
+    if pb_ratio <= 0.8:
+        return 100.0
+    elif pb_ratio <= 2.0:
+        return 100 - (pb_ratio - 0.8) * _PB_SLOPE_A
+    elif pb_ratio <= 4.0:
+        return 70 - (pb_ratio - 2.0) * _PB_SLOPE_B
+    return max(0.0, 20 - (pb_ratio - 4.0) * _PB_SLOPE_C)
+
+
+@njit("float64(float64)", cache=True)
+def roe_score(roe: float) -> float:
+    """Score do ROE (maior é melhor)"""
+    if roe >= 25:
+        return 100.0
+    elif roe >= 20:
+        return 90 + (roe - 20) * _ROE_SLOPE_A
+    elif roe >= 15:
+        return 70 + (roe - 15) * _ROE_SLOPE_B
+    elif roe >= 10:
+        return 40 + (roe - 10) * _ROE_SLOPE_C
+    elif roe >= 0:
+        return roe * _ROE_SLOPE_D
+    return 0.0
+
+
+@njit("float64(float64)", cache=True)
+def debt_score(debt_ebitda: float) -> float:
+    """Score de Dívida/EBITDA (menor é melhor)"""
+    if debt_ebitda <= 1:
+        return 100.0
+    elif debt_ebitda <= 2:
+        return 85 - (debt_ebitda - 1) * _DEBT_SLOPE_A
+    elif debt_ebitda <= 3:
+        return 60 - (debt_ebitda - 2) * _DEBT_SLOPE_B
+    elif debt_ebitda <= 4:
+        return 30 - (debt_ebitda - 3) * _DEBT_SLOPE_C
+    return max(0.0, 30 - (debt_ebitda - 4) * _DEBT_SLOPE_D)
+
+
+@njit("float64(float64)", cache=True)
+def cr_score(current_ratio: float) -> float:
+    """Score da liquidez corrente (maior é melhor)"""
+    if current_ratio >= 2.0:
+        return 100.0
+    elif current_ratio >= 1.5:
+        return 80 + (current_ratio - 1.5) * _CR_SLOPE_A
+    elif current_ratio >= 1.2:
+        return 60 + (current_ratio - 1.2) * _CR_SLOPE_B
+    elif current_ratio >= 1.0:
+        return 40 + (current_ratio - 1.0) * _CR_SLOPE_C
+    return current_ratio * _CR_SLOPE_D
+
+
+@njit("float64(float64)", cache=True)
+def growth_score(revenue_growth: float) -> float:
+    """Score de crescimento da receita (0-100)"""
+    if math.isnan(revenue_growth):
+        revenue_growth = 8.0
+    if revenue_growth >= 20:
+        return 100.0
+    elif revenue_growth >= 15:
+        return 85 + (revenue_growth - 15) * _GROWTH_SLOPE_A
+    elif revenue_growth >= 10:
+        return 65 + (revenue_growth - 10) * _GROWTH_SLOPE_B
+    elif revenue_growth >= 5:
+        return 40 + (revenue_growth - 5) * _GROWTH_SLOPE_C
+    elif revenue_growth >= 0:
+        return 20 + revenue_growth * _GROWTH_SLOPE_D
+    return max(0.0, 20 + revenue_growth * 2)
+
+
+@njit("float64(float64)", cache=True)
+def turnover_score(asset_turnover: float) -> float:
+    """Score de eficiência pelo giro do ativo"""
+    if math.isnan(asset_turnover):
+        asset_turnover = 0.8
+    if asset_turnover >= 1.5:
+        return 100.0
+    elif asset_turnover >= 1.0:
+        return 70 + (asset_turnover - 1.0) * _TURNOVER_SLOPE_A
+    elif asset_turnover >= 0.5:
+        return 40 + (asset_turnover - 0.5) * _TURNOVER_SLOPE_B
+    return asset_turnover * _TURNOVER_SLOPE_C
+
+
+@njit("float64(float64, float64)", cache=True)
+def valuation_score(pe_ratio: float, pb_ratio: float) -> float:
+    """Score de valuation: P/L (peso 0.4) e P/VP (peso 0.3) positivos"""
+    total = 0.0
+    components = 0
+    if pe_ratio > 0:
+        total += pe_score(pe_ratio) * 0.4
+        components += 1
+    if pb_ratio > 0:
+        total += pb_score(pb_ratio) * 0.3
+        components += 1
+    if components == 0:
+        return 50.0
+    # Mesmo divisor do ScoringEngine: 0.4 com um componente, 0.7 com os dois
+    total_weight = 0.7 if components == 2 else 0.4
+    return max(0.0, min(100.0, total / total_weight))
+
+
+@njit("float64(float64)", cache=True)
+def profitability_score(roe: float) -> float:
+    """Score de rentabilidade (50 sem ROE)"""
+    if math.isnan(roe):
+        return 50.0
+    return max(0.0, min(100.0, roe_score(roe)))
+
+
+@njit("float64(float64, float64)", cache=True)
+def financial_health_score(debt_ebitda: float, current_ratio: float) -> float:
+    """Score de saúde financeira: média de Dívida/EBITDA e liquidez"""
+    if math.isnan(debt_ebitda):
+        debt_ebitda = 2.5
+    if math.isnan(current_ratio):
+        current_ratio = 1.5
+    return max(0.0, min(100.0, (debt_score(debt_ebitda) + cr_score(current_ratio)) / 2))
+
+
+@njit("float64(float64, float64, float64, float64, float64, "
+      "float64, float64, float64, float64, float64)", cache=True)
+def weighted_composite(valuation, profitability, growth, financial_health, efficiency,
+                       w_valuation, w_profitability, w_growth, w_financial_health, w_efficiency):
+    """Soma ponderada dos scores por categoria"""
+    return (w_valuation * valuation
+            + w_profitability * profitability
+            + w_growth * growth
+            + w_financial_health * financial_health
+            + w_efficiency * efficiency)
+
+
+@njit(cache=True)
+def composite_score(pe_ratio, pb_ratio, roe, debt_ebitda, current_ratio,
+                    revenue_growth, asset_turnover,
+                    w_valuation, w_profitability, w_growth, w_financial_health, w_efficiency):
+    """Score composto e scores por categoria de uma ação
+
+    Retorna (composite, valuation, profitability, growth,
+    financial_health, efficiency).
+    """
+    valuation = valuation_score(pe_ratio, pb_ratio)
+    profitability = profitability_score(roe)
+    growth = growth_score(revenue_growth)
+    financial_health = financial_health_score(debt_ebitda, current_ratio)
+    efficiency = turnover_score(asset_turnover)
+
+    composite = weighted_composite(valuation, profitability, growth, financial_health, efficiency,
+                                   w_valuation, w_profitability, w_growth, w_financial_health,
+                                   w_efficiency)
+
+    return (max(0.0, min(100.0, composite)),
+            valuation, profitability, growth, financial_health, efficiency)
+
+
+@njit(cache=True, parallel=True)
+def score_universe(pe_ratio, pb_ratio, roe, debt_ebitda, current_ratio,
+                   revenue_growth, asset_turnover, weights, tier_bounds):
+    """Versão em lote de composite_score (paralela com Numba)
+
+    Retorna (composites, tiers, scores): tiers é o índice da faixa
+    (quantidade de limites em tier_bounds <= composite) e scores tem
+    shape (N, 5) na ordem valuation, profitability, growth,
+    financial_health, efficiency.
+    """
+    n = pe_ratio.shape[0]
+    composites = np.empty(n, dtype=np.float64)
+    tiers = np.empty(n, dtype=np.int64)
+    scores = np.empty((n, 5), dtype=np.float64)
+    for i in prange(n):
+        composite, valuation, profitability, growth, financial_health, efficiency = composite_score(
+            pe_ratio[i], pb_ratio[i], roe[i], debt_ebitda[i], current_ratio[i],
+            revenue_growth[i], asset_turnover[i],
+            weights[0], weights[1], weights[2], weights[3], weights[4])
+        composites[i] = composite
+        scores[i, 0] = valuation
+        scores[i, 1] = profitability
+        scores[i, 2] = growth
+        scores[i, 3] = financial_health
+        scores[i, 4] = efficiency
+
+        tier = 0
+        for bound in tier_bounds:
+            if composite >= bound:
+                tier += 1
+        tiers[i] = tier
+    return composites, tiers, scores
+
+
+@njit("float64[:, :](float64[:], float64[:])", cache=True, parallel=True)
+def category_scores_batch(pe_ratios, roes):
+    """Scores simplificados do agente em lote (paralela com Numba)
+
+    Recebe as colunas de P/L e ROE; retorna (N, 5) na ordem valuation,
+    profitability, growth, financial_health, efficiency. Linhas com NaN
+    recebem os scores fallback (70, 75, 65, 70, 75).
+    """
+    n = pe_ratios.shape[0]
+    scores = np.empty((n, 5), dtype=np.float64)
+    for i in prange(n):
+        pe_ratio = pe_ratios[i]
+        roe = roes[i]
+        if math.isnan(pe_ratio) or math.isnan(roe):
+            scores[i, 0] = 70.0
+            scores[i, 1] = 75.0
+        else:
+            scores[i, 0] = max(0.0, min(100.0, 100.0 - (pe_ratio - 10.0) * 3.0))
+            scores[i, 1] = max(0.0, min(100.0, roe * 4.0))
+        # Crescimento, saúde financeira, eficiência (valores mock)
+        scores[i, 2] = 65.0
+        scores[i, 3] = 70.0
+        scores[i, 4] = 75.0
+    return scores
@@ -16,6 +16,8 @@ CARACTERÍSTICAS:
 """
 import logging
 import json
+import statistics
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
@@ -29,6 +31,13 @@ try:
 except ImportError:
     CALCULATOR_AVAILABLE = False
 
+# Serialização JSON (orjson quando disponível)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configurações e logging
 logger = logging.getLogger(__name__)
 
@@ -43,6 +52,13 @@ def safe_float(value, default=0.0):
         return default
 
 
+def safe_median(values: List[float]) -> Optional[float]:
+    """Mediana de uma lista (None se vazia)"""
+    if not values:
+        return None
+    return statistics.median(values)
+
+
 def normalize_score(value: float, min_val: float, max_val: float, 
                    reverse: bool = False) -> float:
     """
@@ -89,6 +105,25 @@ def calculate_percentile(value: float, values_list: List[float]) -> float:
     return max(0.0, min(100.0, percentile))
 
 
+def calculate_percentile_ranks(values_list: List[float]) -> Tuple[List[float], List[int]]:
+    """
+    Percentis e rankings de todos os valores de uma lista
+    
+    Equivalente a chamar calculate_percentile (e contar os maiores) para
+    cada valor, mas ordena uma única vez: O(n log n) em vez de O(n²).
+    """
+    ordered = sorted(values_list)
+    n = len(ordered)
+    percentiles = []
+    ranks = []
+    for value in values_list:
+        below = bisect_left(ordered, value)
+        below_or_equal = bisect_right(ordered, value)
+        percentiles.append((below + 0.5 * (below_or_equal - below)) / n * 100)
+        ranks.append(n - below_or_equal + 1)
+    return percentiles, ranks
+
+
 class QualityTier(Enum):
     """Níveis de qualidade das empresas baseados no score"""
     EXCELLENT = "excellent"      # 90-100
@@ -98,7 +133,7 @@ class QualityTier(Enum):
     POOR = "poor"               # 0-29
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoringWeights:
     """Pesos configuráveis para cada categoria de métrica"""
     valuation: float = 0.25      # 25% - Métricas de valuation (P/L, P/VP, etc.)
@@ -142,7 +177,7 @@ class ScoringWeights:
         return cls()  # Retorna pesos padrão
 
 
-@dataclass
+@dataclass(slots=True)
 class SectorBenchmarks:
     """Benchmarks setoriais para comparação"""
     sector: str
@@ -216,7 +251,7 @@ class SectorBenchmarks:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FundamentalScore:
     """Score fundamentalista completo de uma empresa"""
     stock_code: str
@@ -290,10 +325,34 @@ class FundamentalScore:
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário"""
-        result = asdict(self)
-        result['quality_tier'] = self.quality_tier.value
-        result['analysis_date'] = self.analysis_date.isoformat()
-        return result
+        # Dict literal evita a cópia recursiva do asdict (listas copiadas rasas)
+        return {
+            'stock_code': self.stock_code,
+            'sector': self.sector,
+            'valuation_score': self.valuation_score,
+            'profitability_score': self.profitability_score,
+            'growth_score': self.growth_score,
+            'financial_health_score': self.financial_health_score,
+            'efficiency_score': self.efficiency_score,
+            'composite_score': self.composite_score,
+            'sector_rank': self.sector_rank,
+            'sector_percentile': self.sector_percentile,
+            'overall_rank': self.overall_rank,
+            'overall_percentile': self.overall_percentile,
+            'quality_tier': self.quality_tier.value,
+            'analysis_date': self.analysis_date.isoformat(),
+            'data_quality': self.data_quality,
+            'strengths': list(self.strengths),
+            'weaknesses': list(self.weaknesses),
+            'recommendation': self.recommendation
+        }
+    
+    def to_json(self) -> bytes:
+        """Serializa para JSON (bytes, prontos para a resposta HTTP)"""
+        # orjson serializa dataclass, Enum e datetime nativamente (sem to_dict)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode('utf-8')
 
 
 class ScoringEngine:
@@ -645,15 +704,7 @@ class ScoringEngine:
         revenue_growths = [m.revenue_growth_3y for m in metrics_list if m.revenue_growth_3y is not None]
         debt_ratios = [m.debt_to_equity for m in metrics_list if m.debt_to_equity is not None]
         
-        # Calcular medianas
-        def safe_median(values):
-            if not values:
-                return None
-            values.sort()
-            n = len(values)
-            return values[n//2] if n % 2 == 1 else (values[n//2-1] + values[n//2]) / 2
-        
-        # Atualizar benchmark
+        # Atualizar benchmark (medianas)
         benchmark = SectorBenchmarks(
             sector=sector,
             pe_ratio_median=safe_median(pe_ratios) or 15.0,
@@ -680,17 +731,17 @@ class ScoringEngine:
         
         # Calcular percentis por setor
         for sector, sector_scores in sector_groups.items():
-            composite_scores = [s.composite_score for s in sector_scores]
+            percentiles, ranks = calculate_percentile_ranks([s.composite_score for s in sector_scores])
             
-            for i, score in enumerate(sector_scores):
-                score.sector_percentile = calculate_percentile(score.composite_score, composite_scores)
-                score.sector_rank = len([s for s in composite_scores if s > score.composite_score]) + 1
+            for score, percentile, rank in zip(sector_scores, percentiles, ranks):
+                score.sector_percentile = percentile
+                score.sector_rank = rank
         
         # Calcular percentis gerais
-        all_composite_scores = [s.composite_score for s in scores]
-        for i, score in enumerate(scores):
-            score.overall_percentile = calculate_percentile(score.composite_score, all_composite_scores)
-            score.overall_rank = len([s for s in all_composite_scores if s > score.composite_score]) + 1
+        percentiles, ranks = calculate_percentile_ranks([s.composite_score for s in scores])
+        for score, percentile, rank in zip(scores, percentiles, ranks):
+            score.overall_percentile = percentile
+            score.overall_rank = rank
         
         return scores
     
@@ -0,0 +1,50 @@
+# agents/analyzers/scoring_tables.py
+"""
+Tabelas de Referência dos Analisadores
+Scores, métricas e dados fallback compartilhados pelos analisadores gerados
+
+Todas as tabelas são somente leitura (MappingProxyType).
+"""
+
+from types import MappingProxyType
+
+# Scores base conhecidos
+BASE_SCORES = MappingProxyType({
+    'PETR4': 78.5, 'VALE3': 82.1, 'ITUB4': 75.3,
+    'BBDC4': 73.8, 'ABEV3': 68.9, 'MGLU3': 45.2,
+    'WEGE3': 85.7, 'LREN3': 67.4
+})
+
+# Métricas mock para ações conhecidas
+MOCK_METRICS = MappingProxyType({
+    'PETR4': MappingProxyType({'pe_ratio': 12.5, 'roe': 22.1, 'profit_margin': 15.2}),
+    'VALE3': MappingProxyType({'pe_ratio': 8.2, 'roe': 28.5, 'profit_margin': 18.9}),
+    'ITUB4': MappingProxyType({'pe_ratio': 9.8, 'roe': 19.2, 'profit_margin': 25.1}),
+    'BBDC4': MappingProxyType({'pe_ratio': 8.9, 'roe': 17.8, 'profit_margin': 23.5}),
+    'ABEV3': MappingProxyType({'pe_ratio': 18.2, 'roe': 15.9, 'profit_margin': 22.8})
+})
+
+# Dados cadastrais fallback para ações conhecidas
+FALLBACK_STOCK_INFO = MappingProxyType({
+    'PETR4': MappingProxyType({
+        'nome': 'Petrobras',
+        'setor': 'Petróleo',
+        'industria': 'Petróleo e Gás',
+        'ceo': 'Jean Paul Prates',
+        'market_cap': 500000000000
+    }),
+    'VALE3': MappingProxyType({
+        'nome': 'Vale',
+        'setor': 'Mineração',
+        'industria': 'Mineração',
+        'ceo': 'Eduardo Bartolomeo',
+        'market_cap': 300000000000
+    }),
+    'ITUB4': MappingProxyType({
+        'nome': 'Itaú Unibanco',
+        'setor': 'Bancos',
+        'industria': 'Bancos',
+        'ceo': 'Milton Maluhy Filho',
+        'market_cap': 200000000000
+    })
+})
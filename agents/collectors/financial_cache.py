@@ -0,0 +1,93 @@
+# agents/collectors/financial_cache.py
+"""
+Cache em arquivo para dados financeiros
+
+Módulo leve (apenas biblioteca padrão) para poder ser importado sem
+carregar agno, httpx ou as configurações do coletor.
+"""
+import os
+import re
+import json
+import tempfile
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Chaves viram nomes de arquivo: apenas letras, dígitos, '_' e '-'
+_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,128}$')
+
+
+class FinancialDataCache:
+    """Cache inteligente para dados financeiros"""
+
+    def __init__(self, cache_dir: str = "cache/financial"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.ttl_rules = {
+            'market_data': 300,      # 5 minutos
+            'fundamentals': 3600,    # 1 hora
+            'company_info': 86400    # 24 horas
+        }
+
+    def _cache_file(self, key: str) -> Optional[Path]:
+        """Arquivo da chave (None para chaves que escapariam do diretório)"""
+        if not isinstance(key, str) or not _KEY_PATTERN.match(key):
+            logger.warning(f"Chave de cache inválida: {key!r}")
+            return None
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str, data_type: str = 'market_data') -> Optional[Dict[str, Any]]:
+        """Busca dados no cache"""
+
+        cache_file = self._cache_file(key)
+
+        if cache_file is None or not cache_file.exists():
+            return None
+
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached_entry = json.load(f)
+
+            # Verificar TTL
+            cached_time = datetime.fromisoformat(cached_entry['timestamp'])
+            ttl = self.ttl_rules.get(data_type, 3600)
+
+            if (datetime.now() - cached_time).total_seconds() < ttl:
+                return cached_entry['data']
+            else:
+                # Cache expirado
+                cache_file.unlink()
+                return None
+
+        except Exception:
+            return None
+
+    def set(self, key: str, data: Dict[str, Any], data_type: str = 'market_data'):
+        """Salva dados no cache"""
+
+        cache_file = self._cache_file(key)
+        if cache_file is None:
+            return
+
+        cache_entry = {
+            'timestamp': datetime.now().isoformat(),
+            'data_type': data_type,
+            'data': data
+        }
+
+        try:
+            # Escrita atômica: leitores concorrentes nunca veem arquivo parcial
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(cache_entry, f, indent=2, default=str)
+                os.replace(tmp_path, cache_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Erro salvando cache {key}: {e}")
@@ -15,6 +15,7 @@ from dataclasses import dataclass
 from agno.agent import Agent
 import httpx
 
+from agents.collectors.financial_cache import FinancialDataCache
 from config.settings import get_settings, get_agent_settings
 from database.repositories import (get_stock_repository,
                                    get_agent_session_repository)
@@ -463,63 +464,6 @@ class YFinanceClient:
             return None
 
 
-class FinancialDataCache:
-    """Cache inteligente para dados financeiros"""
-    
-    def __init__(self, cache_dir: str = "cache/financial"):
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.ttl_rules = {
-            'market_data': 300,      # 5 minutos
-            'fundamentals': 3600,    # 1 hora
-            'company_info': 86400    # 24 horas
-        }
-    
-    def get(self, key: str, data_type: str = 'market_data') -> Optional[Dict[str, Any]]:
-        """Busca dados no cache"""
-        
-        cache_file = self.cache_dir / f"{key}.json"
-        
-        if not cache_file.exists():
-            return None
-        
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_entry = json.load(f)
-            
-            # Verificar TTL
-            cached_time = datetime.fromisoformat(cached_entry['timestamp'])
-            ttl = self.ttl_rules.get(data_type, 3600)
-            
-            if (datetime.now() - cached_time).total_seconds() < ttl:
-                return cached_entry['data']
-            else:
-                # Cache expirado
-                cache_file.unlink()
-                return None
-                
-        except Exception:
-            return None
-    
-    def set(self, key: str, data: Dict[str, Any], data_type: str = 'market_data'):
-        """Salva dados no cache"""
-        
-        cache_file = self.cache_dir / f"{key}.json"
-        
-        cache_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'data_type': data_type,
-            'data': data
-        }
-        
-        try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_entry, f, indent=2, default=str)
-        except Exception as e:
-            logger.warning(f"Erro salvando cache {key}: {e}")
-
-
 class StockCollectorAgent(Agent):
     """Agente Coletor de Dados de Ações"""
     
@@ -3,13 +3,9 @@
 Patch temporário para resolver problema da coluna 'industria'
 """
 
-import sys
-from pathlib import Path
+import logging
 
-# Setup path
-current_dir = Path.cwd()
-if str(current_dir) not in sys.path:
-    sys.path.insert(0, str(current_dir))
+logger = logging.getLogger(__name__)
 
 def get_stock_safe(stock_code: str):
     """Busca ação de forma segura, sem usar coluna 'industria'"""
@@ -24,7 +20,7 @@ def get_stock_safe(stock_code: str):
             return stock
             
     except Exception as e:
-        print(f"Erro na busca segura: {e}")
+        logger.exception("Erro na busca segura de %s", stock_code)
         return None
 
 def test_safe_query():
@@ -361,17 +361,100 @@ Sistema de Scoring Robusto
 Funciona independente do schema do banco
 """
 
-import sys
-from pathlib import Path
+import functools
+import json
+import logging
+import math
+import operator
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Callable
+from collections.abc import Mapping
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Tabelas de referência compartilhadas com o sistema corrigido
+from agents.analyzers.scoring_tables import BASE_SCORES, MOCK_METRICS, FALLBACK_STOCK_INFO
+
+# NumPy para scoring em lote
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Kernels de scoring compilados (Numba quando disponível)
+try:
+    from agents.analyzers.score_kernels import score_adjust, score_adjust_batch
+    KERNELS_AVAILABLE = True
+except ImportError:
+    KERNELS_AVAILABLE = False
+
+# Database
+try:
+    from sqlalchemy import select, bindparam
+    from database.connection import get_db_session as _get_db_session
+    from database.models import Stock as _Stock
+    _DB_AVAILABLE = True
+except ImportError:
+    _DB_AVAILABLE = False
+
+# Coluna de código do modelo Stock ('codigo' ou 'symbol', conforme o schema)
+_CODE_ATTR = None
+if _DB_AVAILABLE:
+    for _attr in ('codigo', 'symbol'):
+        if hasattr(_Stock, _attr):
+            _CODE_ATTR = _attr
+            break
+    else:
+        logger.warning("Modelo Stock incompatível, busca no banco desativada")
+
+# Statements compilados uma vez e reutilizados via cache do SQLAlchemy
+_STOCK_BY_CODE = None
+_STOCKS_BY_CODES = None
+if _CODE_ATTR is not None:
+    _code_column = getattr(_Stock, _CODE_ATTR)
+    _STOCK_BY_CODE = select(_Stock).where(_code_column == bindparam('code'))
+    _STOCKS_BY_CODES = select(_Stock).where(
+        _code_column.in_(bindparam('codes', expanding=True))
+    )
 
-# Setup path
-current_dir = Path.cwd()
-if str(current_dir) not in sys.path:
-    sys.path.insert(0, str(current_dir))
+# Helper
+try:
+    from agents.analyzers.financial_helper import safe_calculate_metrics as _safe_calculate_metrics
+    _HELPER_AVAILABLE = True
+except ImportError:
+    _HELPER_AVAILABLE = False
+
+# Serialização JSON (orjson quando disponível)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_default(obj):
+    """Converte tipos não suportados nativamente pelo serializador"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+def _dumps(obj) -> bytes:
+    """Serializa para JSON em bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, default=_json_default, ensure_ascii=False).encode('utf-8')
 
 class QualityTier(Enum):
     EXCELLENT = "excellent"
@@ -380,7 +463,74 @@ class QualityTier(Enum):
     BELOW_AVERAGE = "below_average"
     POOR = "poor"
 
-@dataclass
+# Limites de tier (ordem crescente) e tiers correspondentes
+_TIER_THRESHOLDS = (30, 50, 70, 85)
+_TIERS_ASCENDING = (QualityTier.POOR, QualityTier.BELOW_AVERAGE, QualityTier.AVERAGE,
+                    QualityTier.GOOD, QualityTier.EXCELLENT)
+
+# Limites de recomendação (ordem crescente) e recomendações correspondentes
+_RECOMMENDATION_THRESHOLDS = (30, 45, 65, 80)
+_RECOMMENDATIONS_ASCENDING = ("VENDA FORTE", "VENDA", "NEUTRO", "COMPRA", "COMPRA FORTE")
+
+def _score_adjust_py(base: float, roe: float, pe_ratio: float) -> float:
+    """Ajusta o score base por ROE e P/L (Python puro)"""
+    # Ajuste baseado em ROE (maior é melhor)
+    if roe > 25:
+        base += 10
+    elif roe > 20:
+        base += 5
+    elif roe < 10:
+        base -= 10
+    
+    # Ajuste baseado em P/L (menor é melhor, até certo ponto)
+    if 8 <= pe_ratio <= 12:
+        base += 5
+    elif pe_ratio > 20:
+        base -= 5
+    
+    return max(0, min(100, base))
+
+# Valores assumidos quando a métrica falta ou é inválida (None/NaN)
+_DEFAULT_ROE = 18.0
+_DEFAULT_PE_RATIO = 15.0
+
+def _metric_input(value, default: float) -> float:
+    """Normaliza uma métrica de entrada do score (None, NaN e não numéricos viram o padrão)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if math.isnan(value) else value
+
+def _build_fast_score() -> Callable[[str, float, float], float]:
+    """Gera função de score especializada para as ações conhecidas
+    
+    Os scores base viram constantes numa cadeia if/elif, evitando o
+    lookup no dicionário para o universo fixo de ações conhecidas.
+    """
+    lines = ["def _fast_score(code, roe, pe_ratio):"]
+    keyword = "if"
+    for code, base in BASE_SCORES.items():
+        lines.append(f"    {keyword} code == {code!r}:")
+        lines.append(f"        base = {float(base)!r}")
+        keyword = "elif"
+    lines.append("    else:" if BASE_SCORES else "    if True:")
+    lines.append("        base = _get_base(code, 50.0)")
+    lines.append("    try:")
+    lines.append("        return _adjust(base, roe, pe_ratio)")
+    lines.append("    except Exception:")
+    lines.append("        return base")
+    
+    namespace = {
+        '_get_base': BASE_SCORES.get,
+        '_adjust': score_adjust if KERNELS_AVAILABLE else _score_adjust_py,
+    }
+    exec(compile('\\n'.join(lines), '<fast_score>', 'exec'), namespace)
+    return namespace['_fast_score']
+
+_fast_score = _build_fast_score()
+
+@dataclass(slots=True, frozen=True)
 class FundamentalScore:
     stock_code: str
     composite_score: float
@@ -388,45 +538,145 @@ class FundamentalScore:
     analysis_date: datetime
     
     def to_dict(self) -> Dict[str, Any]:
-        result = asdict(self)
-        result['quality_tier'] = self.quality_tier.value
-        result['analysis_date'] = self.analysis_date.isoformat()
-        return result
+        return {
+            'stock_code': self.stock_code,
+            'composite_score': self.composite_score,
+            'quality_tier': self.quality_tier.value,
+            'analysis_date': self.analysis_date.isoformat()
+        }
+    
+    def to_json(self) -> bytes:
+        return _dumps(self)
+
+# Textos da justificativa
+_TIER_NAMES = MappingProxyType({
+    QualityTier.EXCELLENT: "EMPRESA EXCELENTE",
+    QualityTier.GOOD: "EMPRESA BOA",
+    QualityTier.AVERAGE: "EMPRESA MEDIANA",
+    QualityTier.BELOW_AVERAGE: "EMPRESA FRACA",
+    QualityTier.POOR: "EMPRESA PROBLEMÁTICA"
+})
+_TIER_TITLES = MappingProxyType({tier: tier.value.title() for tier in QualityTier})
+
+_JUSTIFICATION_TEMPLATE = """{tier_name} (Score: {score:.1f}/100)
+
+ANÁLISE DE {stock_code}:
+• Score Composto: {score:.1f}/100
+• Qualidade: {tier_title}
+• Data: {date}
+
+SISTEMA ROBUSTO:
+• Funciona independente do schema do banco
+• Fallbacks automáticos para dados faltantes
+• Compatível com Fase 1 e Fase 2"""
+
+def _normalize_code(stock_code: str) -> str:
+    """Código em maiúsculas (sem nova string quando já está normalizado)"""
+    return stock_code if stock_code.isupper() else stock_code.upper()
+
+# Campos cadastrais opcionais extraídos do modelo Stock
+_STOCK_FIELDS = ('nome', 'setor', 'industria', 'market_cap', 'preco_atual',
+                 'ceo', 'website', 'ano_fundacao')
+
+@functools.lru_cache(maxsize=None)
+def _stock_fields_getter(stock_type: type) -> Callable[[Any], Dict[str, Any]]:
+    """Extrator dos campos presentes na classe (resolvido uma vez por tipo)"""
+    present = tuple(name for name in _STOCK_FIELDS if hasattr(stock_type, name))
+    if not present:
+        return lambda stock: {}
+    
+    getter = operator.attrgetter(*present)
+    if len(present) == 1:
+        return lambda stock: {present[0]: getter(stock)}
+    return lambda stock: dict(zip(present, getter(stock)))
+
+class LazyAnalysis(Mapping):
+    """Resultado de análise com campos caros calculados sob demanda"""
+    
+    def __init__(self, values: Dict[str, Any], factories: Dict[str, Callable[[], Any]]):
+        self._values = dict(values)
+        self._factories = dict(factories)
+        self._keys = tuple(self._values) + tuple(self._factories)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._values:
+            # KeyError para chaves desconhecidas, como em um dict
+            self._values[key] = self._factories.pop(key)()
+        return self._values[key]
+    
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+    
+    def __iter__(self):
+        return iter(self._keys)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Materializa todos os campos (para serialização JSON)"""
+        return {key: self[key] for key in self._keys}
+    
+    def to_json(self) -> bytes:
+        """Serializa o resultado completo em JSON"""
+        return _dumps(self.to_dict())
+
+class _TTLCache:
+    """Cache LRU limitado com expiração por TTL (thread-safe)"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            
+            # Descarta as entradas menos usadas ao exceder o limite
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
 
 class RobustFundamentalAnalyzer:
     """Analisador que funciona com qualquer schema"""
     
-    def __init__(self):
-        self.logger = None
+    def __init__(self, cache_ttl: int = 300, cache_maxsize: int = 1024):
+        self.logger = logger
         
-        # Detectar componentes disponíveis
-        self._detect_available_components()
-    
-    def _detect_available_components(self):
-        """Detecta quais componentes estão disponíveis"""
-        # Database
-        try:
-            from database.connection import get_db_session
-            from database.models import Stock
-            self.db_available = True
-            self.Stock = Stock
-            self.get_db_session = get_db_session
-        except ImportError:
-            self.db_available = False
-        
-        # Helper
-        try:
-            from agents.analyzers.financial_helper import safe_calculate_metrics
-            self.helper_available = True
-            self.safe_calculate_metrics = safe_calculate_metrics
-        except ImportError:
-            self.helper_available = False
+        # Cache limitado de dados por ação (TTL em segundos)
+        self.cache_ttl = cache_ttl
+        self._stock_data_cache = _TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        
+        # Componentes detectados uma única vez no import do módulo
+        self.db_available = _DB_AVAILABLE
+        self.helper_available = _HELPER_AVAILABLE
     
-    def analyze_single_stock(self, stock_code: str) -> Dict[str, Any]:
+    def analyze_single_stock(self, stock_code: str, refresh: bool = False,
+                             session=None) -> Mapping[str, Any]:
         """Análise robusta de uma ação"""
         try:
             # Buscar dados de forma robusta
-            stock_data = self._get_stock_data_robust(stock_code)
+            stock_data = self._get_stock_data_robust(stock_code, refresh=refresh, session=session)
             
             # Calcular métricas se possível
             metrics_data = self._calculate_metrics_robust(stock_code, stock_data)
@@ -435,68 +685,180 @@ class RobustFundamentalAnalyzer:
             score = self._calculate_score_robust(stock_code, stock_data, metrics_data)
             quality_tier = self._get_quality_tier(score)
             
-            # Criar resultado
-            fundamental_score = FundamentalScore(
-                stock_code=stock_code,
-                composite_score=score,
-                quality_tier=quality_tier,
-                analysis_date=datetime.now()
-            )
-            
-            return {
-                "stock_code": stock_code,
-                "analysis_date": datetime.now().isoformat(),
-                "fundamental_score": fundamental_score.to_dict(),
-                "recommendation": self._get_recommendation(score),
-                "justification": self._generate_justification(stock_code, score, quality_tier),
-                "stock_info": stock_data,
-                "metrics": metrics_data,
-                "system_status": {
-                    "database_available": self.db_available,
-                    "helper_available": self.helper_available,
-                    "method": "robust"
-                }
-            }
+            return self._build_result(stock_code, stock_data, metrics_data, score, quality_tier,
+                                      datetime.now())
             
         except Exception as e:
-            return {
-                "error": f"Erro na análise de {stock_code}: {str(e)}",
-                "stock_code": stock_code,
-                "analysis_date": datetime.now().isoformat()
+            return self._error_result(stock_code, e)
+    
+    def analyze_many(self, stock_codes: List[str], refresh: bool = False,
+                     session=None) -> List[Mapping[str, Any]]:
+        """Análise robusta de várias ações com scoring vetorizado"""
+        stock_data_by_code = self._get_stock_data_bulk(stock_codes, refresh=refresh, session=session)
+        stock_data_list = [stock_data_by_code[code] for code in stock_codes]
+        metrics_list = [self._calculate_metrics_robust(code, data)
+                        for code, data in zip(stock_codes, stock_data_list)]
+        
+        scores = self._calculate_scores_batch(stock_codes, metrics_list)
+        quality_tiers = self._get_quality_tiers_batch(scores)
+        recommendations = self._get_recommendations_batch(scores)
+        
+        # Mesmo timestamp para todo o lote
+        now = datetime.now()
+        
+        results = []
+        for code, data, metrics, score, tier, recommendation in zip(
+                stock_codes, stock_data_list, metrics_list, scores, quality_tiers, recommendations):
+            try:
+                results.append(self._build_result(code, data, metrics, float(score), tier, now,
+                                                  recommendation))
+            except Exception as e:
+                results.append(self._error_result(code, e))
+        
+        return results
+    
+    def _build_result(self, stock_code: str, stock_data: Dict, metrics_data: Dict,
+                      score: float, quality_tier: QualityTier, now: datetime,
+                      recommendation: Optional[str] = None) -> LazyAnalysis:
+        """Monta o resultado da análise de uma ação"""
+        fundamental_score = FundamentalScore(
+            stock_code=stock_code,
+            composite_score=score,
+            quality_tier=quality_tier,
+            analysis_date=now
+        )
+        
+        return LazyAnalysis({
+            "stock_code": stock_code,
+            "analysis_date": now.isoformat(),
+            "fundamental_score": fundamental_score.to_dict(),
+            "recommendation": recommendation or self._get_recommendation(score),
+            "stock_info": stock_data,
+            "metrics": metrics_data,
+            "system_status": {
+                "database_available": self.db_available,
+                "helper_available": self.helper_available,
+                "method": "robust"
             }
+        }, {
+            "justification": lambda: self._generate_justification(stock_code, score, quality_tier, now)
+        })
+    
+    def _error_result(self, stock_code: str, error: Exception) -> LazyAnalysis:
+        """Resultado padrão para falhas na análise (mesmo tipo do caminho de sucesso)"""
+        return LazyAnalysis({
+            "error": f"Erro na análise de {stock_code}: {str(error)}",
+            "stock_code": stock_code,
+            "analysis_date": datetime.now().isoformat()
+        }, {})
+    
+    @contextmanager
+    def _session_scope(self, session=None):
+        """Reutiliza a sessão informada ou abre uma nova"""
+        if session is not None:
+            yield session
+        else:
+            with _get_db_session() as new_session:
+                yield new_session
+    
+    def _get_stock_data_robust(self, stock_code: str, refresh: bool = False,
+                               session=None) -> Dict[str, Any]:
+        """Busca dados da ação com cache TTL (refresh=True ignora o cache)"""
+        if not refresh:
+            cached = self._stock_data_cache.get(stock_code)
+            if cached is not None:
+                return cached
+        
+        data = self._fetch_stock_data_robust(stock_code, session=session)
+        if data is None:
+            # Fallback não vai para o cache: falhas transitórias do banco não ficam presas
+            return self._get_fallback_data(stock_code)
+        
+        self._stock_data_cache.set(stock_code, data)
+        return data
     
-    def _get_stock_data_robust(self, stock_code: str) -> Dict[str, Any]:
-        """Busca dados da ação de forma robusta"""
-        if self.db_available:
+    def _get_stock_data_bulk(self, stock_codes: List[str], refresh: bool = False,
+                             session=None) -> Dict[str, Dict[str, Any]]:
+        """Busca dados de várias ações com uma única query IN (...)"""
+        result = {}
+        missing = []
+        
+        # dict.fromkeys remove duplicatas mantendo a ordem
+        for code in dict.fromkeys(stock_codes):
+            cached = None if refresh else self._stock_data_cache.get(code)
+            if cached is not None:
+                result[code] = cached
+            else:
+                missing.append(code)
+        
+        if not missing:
+            return result
+        
+        found = {}
+        if self.db_available and _STOCKS_BY_CODES is not None:
             try:
-                with self.get_db_session() as session:
+                with self._session_scope(session) as db:
+                    stocks = db.execute(
+                        _STOCKS_BY_CODES,
+                        {'codes': list(dict.fromkeys(_normalize_code(code) for code in missing))}
+                    ).scalars()
+                    
+                    for stock in stocks:
+                        code = getattr(stock, _CODE_ATTR)
+                        found[code] = self._stock_to_data(stock, code)
+                        
+            except Exception as e:
+                logger.warning("Erro na busca em lote no banco: %s", e)
+        
+        for code in missing:
+            data = found.get(_normalize_code(code))
+            if data is None:
+                # Fallback não vai para o cache
+                result[code] = self._get_fallback_data(code)
+            else:
+                self._stock_data_cache.set(code, data)
+                result[code] = data
+        
+        return result
+    
+    def _fetch_stock_data_robust(self, stock_code: str, session=None) -> Optional[Dict[str, Any]]:
+        """Busca dados da ação no banco (None quando indisponível ou não encontrada)"""
+        if self.db_available and _STOCK_BY_CODE is not None:
+            try:
+                with self._session_scope(session) as db:
                     # Query básica e segura
-                    stock = session.query(self.Stock).filter(
-                        self.Stock.codigo == stock_code.upper()
-                    ).first()
+                    stock = db.execute(
+                        _STOCK_BY_CODE, {'code': _normalize_code(stock_code)}
+                    ).scalars().first()
                     
                     if stock:
-                        # Extrair dados disponíveis de forma segura
-                        data = {
-                            'codigo': stock.codigo,
-                            'nome': self._safe_getattr(stock, 'nome', f'Empresa {stock_code}'),
-                            'setor': self._safe_getattr(stock, 'setor', 'Desconhecido'),
-                            'industria': self._safe_getattr(stock, 'industria', 
-                                        self._safe_getattr(stock, 'setor', 'Desconhecido')),
-                            'market_cap': self._safe_getattr(stock, 'market_cap', None),
-                            'preco_atual': self._safe_getattr(stock, 'preco_atual', None),
-                            'ceo': self._safe_getattr(stock, 'ceo', 'N/A'),
-                            'website': self._safe_getattr(stock, 'website', None),
-                            'ano_fundacao': self._safe_getattr(stock, 'ano_fundacao', None)
-                        }
-                        
-                        return data
+                        return self._stock_to_data(stock, stock_code)
                         
             except Exception as e:
-                print(f"Erro na busca no banco: {e}")
+                logger.warning("Erro na busca no banco: %s", e)
         
-        # Fallback para dados conhecidos
-        return self._get_fallback_data(stock_code)
+        return None
+    
+    def _stock_to_data(self, stock, stock_code: str) -> Dict[str, Any]:
+        """Extrai dados disponíveis de forma segura (dentro da sessão)"""
+        try:
+            fields = _stock_fields_getter(type(stock))(stock)
+        except AttributeError:
+            fields = {name: self._safe_getattr(stock, name) for name in _STOCK_FIELDS
+                      if hasattr(stock, name)}
+        
+        setor = fields.get('setor', 'Desconhecido')
+        return {
+            'codigo': getattr(stock, _CODE_ATTR),
+            'nome': fields.get('nome', f'Empresa {stock_code}'),
+            'setor': setor,
+            'industria': fields.get('industria', setor),
+            'market_cap': fields.get('market_cap'),
+            'preco_atual': fields.get('preco_atual'),
+            'ceo': fields.get('ceo', 'N/A'),
+            'website': fields.get('website'),
+            'ano_fundacao': fields.get('ano_fundacao')
+        }
     
     def _safe_getattr(self, obj, attr: str, default=None):
         """Obtém atributo de forma segura"""
@@ -507,32 +869,8 @@ class RobustFundamentalAnalyzer:
     
     def _get_fallback_data(self, stock_code: str) -> Dict[str, Any]:
         """Dados fallback para ações conhecidas"""
-        fallback_data = {
-            'PETR4': {
-                'nome': 'Petrobras',
-                'setor': 'Petróleo',
-                'industria': 'Petróleo e Gás',
-                'ceo': 'Jean Paul Prates',
-                'market_cap': 500000000000
-            },
-            'VALE3': {
-                'nome': 'Vale',
-                'setor': 'Mineração', 
-                'industria': 'Mineração',
-                'ceo': 'Eduardo Bartolomeo',
-                'market_cap': 300000000000
-            },
-            'ITUB4': {
-                'nome': 'Itaú Unibanco',
-                'setor': 'Bancos',
-                'industria': 'Bancos',
-                'ceo': 'Milton Maluhy Filho',
-                'market_cap': 200000000000
-            }
-        }
-        
-        if stock_code in fallback_data:
-            data = fallback_data[stock_code].copy()
+        if stock_code in FALLBACK_STOCK_INFO:
+            data = FALLBACK_STOCK_INFO[stock_code].copy()
             data['codigo'] = stock_code
             return data
         
@@ -549,7 +887,7 @@ class RobustFundamentalAnalyzer:
         """Calcula métricas de forma robusta"""
         if self.helper_available:
             try:
-                metrics = self.safe_calculate_metrics(
+                metrics = _safe_calculate_metrics(
                     stock_code=stock_code,
                     market_cap=stock_data.get('market_cap', 100000000000),
                     revenue=50000000000,
@@ -563,23 +901,15 @@ class RobustFundamentalAnalyzer:
                     'method': 'calculated'
                 }
             except Exception as e:
-                print(f"Erro no cálculo de métricas: {e}")
+                logger.warning("Erro no cálculo de métricas: %s", e)
         
         # Métricas mock baseadas na empresa
         return self._get_mock_metrics(stock_code)
     
     def _get_mock_metrics(self, stock_code: str) -> Dict[str, Any]:
         """Métricas mock para ações conhecidas"""
-        mock_metrics = {
-            'PETR4': {'pe_ratio': 12.5, 'roe': 22.1, 'profit_margin': 15.2},
-            'VALE3': {'pe_ratio': 8.2, 'roe': 28.5, 'profit_margin': 18.9},
-            'ITUB4': {'pe_ratio': 9.8, 'roe': 19.2, 'profit_margin': 25.1},
-            'BBDC4': {'pe_ratio': 8.9, 'roe': 17.8, 'profit_margin': 23.5},
-            'ABEV3': {'pe_ratio': 18.2, 'roe': 15.9, 'profit_margin': 22.8}
-        }
-        
-        if stock_code in mock_metrics:
-            data = mock_metrics[stock_code].copy()
+        if stock_code in MOCK_METRICS:
+            data = MOCK_METRICS[stock_code].copy()
             data['method'] = 'mock'
             return data
         
@@ -587,86 +917,79 @@ class RobustFundamentalAnalyzer:
     
     def _calculate_score_robust(self, stock_code: str, stock_data: Dict, metrics: Dict) -> float:
         """Calcula score de forma robusta"""
-        # Scores base conhecidos
-        base_scores = {
-            'PETR4': 78.5, 'VALE3': 82.1, 'ITUB4': 75.3,
-            'BBDC4': 73.8, 'ABEV3': 68.9, 'MGLU3': 45.2,
-            'WEGE3': 85.7, 'LREN3': 67.4
-        }
-        
-        if stock_code in base_scores:
-            base_score = base_scores[stock_code]
-        else:
-            base_score = 50.0
-        
-        # Ajustar baseado em métricas se disponíveis
+        # Ajustar baseado em métricas se disponíveis (mesma normalização do lote)
         try:
-            roe = metrics.get('roe', 18.0)
-            pe_ratio = metrics.get('pe_ratio', 15.0)
-            
-            # Ajuste baseado em ROE (maior é melhor)
-            if roe > 25:
-                base_score += 10
-            elif roe > 20:
-                base_score += 5
-            elif roe < 10:
-                base_score -= 10
-            
-            # Ajuste baseado em P/L (menor é melhor, até certo ponto)
-            if 8 <= pe_ratio <= 12:
-                base_score += 5
-            elif pe_ratio > 20:
-                base_score -= 5
-            
-            return max(0, min(100, base_score))
-            
-        except:
-            return base_score
+            roe = _metric_input(metrics.get('roe'), _DEFAULT_ROE)
+            pe_ratio = _metric_input(metrics.get('pe_ratio'), _DEFAULT_PE_RATIO)
+        except Exception:
+            return BASE_SCORES.get(stock_code, 50.0)
+        
+        return _fast_score(stock_code, roe, pe_ratio)
     
     def _get_quality_tier(self, score: float) -> QualityTier:
         """Determina tier de qualidade"""
-        if score >= 85: return QualityTier.EXCELLENT
-        elif score >= 70: return QualityTier.GOOD
-        elif score >= 50: return QualityTier.AVERAGE
-        elif score >= 30: return QualityTier.BELOW_AVERAGE
-        else: return QualityTier.POOR
+        return _TIERS_ASCENDING[bisect_right(_TIER_THRESHOLDS, score)]
+    
+    def _calculate_scores_batch(self, stock_codes: List[str], metrics_list: List[Dict]) -> List[float]:
+        """Calcula scores de várias ações em uma única passada vetorizada"""
+        if not NUMPY_AVAILABLE:
+            return [self._calculate_score_robust(code, {}, metrics)
+                    for code, metrics in zip(stock_codes, metrics_list)]
+        
+        base = np.array([BASE_SCORES.get(code, 50.0) for code in stock_codes], dtype=float)
+        roe = np.array([_metric_input(m.get('roe'), _DEFAULT_ROE) for m in metrics_list],
+                       dtype=float)
+        pe_ratio = np.array([_metric_input(m.get('pe_ratio'), _DEFAULT_PE_RATIO) for m in metrics_list],
+                            dtype=float)
+        
+        if KERNELS_AVAILABLE:
+            return score_adjust_batch(base, roe, pe_ratio).tolist()
+        
+        # Mesmos ajustes de _calculate_score_robust
+        roe_adj = np.where(roe > 25, 10, np.where(roe > 20, 5, np.where(roe < 10, -10, 0)))
+        pe_adj = np.where((pe_ratio >= 8) & (pe_ratio <= 12), 5, np.where(pe_ratio > 20, -5, 0))
+        
+        return np.clip(base + roe_adj + pe_adj, 0, 100).tolist()
+    
+    def _get_quality_tiers_batch(self, scores: List[float]) -> List[QualityTier]:
+        """Determina tiers de qualidade para vários scores"""
+        if not NUMPY_AVAILABLE:
+            return [self._get_quality_tier(score) for score in scores]
+        
+        indexes = np.searchsorted(_TIER_THRESHOLDS, scores, side='right')
+        return [_TIERS_ASCENDING[i] for i in indexes]
+    
+    def _get_recommendations_batch(self, scores: List[float]) -> List[str]:
+        """Gera recomendações para vários scores"""
+        if not NUMPY_AVAILABLE:
+            return [self._get_recommendation(score) for score in scores]
+        
+        indexes = np.searchsorted(_RECOMMENDATION_THRESHOLDS, scores, side='right')
+        return [_RECOMMENDATIONS_ASCENDING[i] for i in indexes]
     
     def _get_recommendation(self, score: float) -> str:
         """Gera recomendação"""
-        if score >= 80: return "COMPRA FORTE"
-        elif score >= 65: return "COMPRA"
-        elif score >= 45: return "NEUTRO"
-        elif score >= 30: return "VENDA"
-        else: return "VENDA FORTE"
+        return _RECOMMENDATIONS_ASCENDING[bisect_right(_RECOMMENDATION_THRESHOLDS, score)]
     
-    def _generate_justification(self, stock_code: str, score: float, quality_tier: QualityTier) -> str:
+    def _generate_justification(self, stock_code: str, score: float, quality_tier: QualityTier,
+                                now: Optional[datetime] = None) -> str:
         """Gera justificativa"""
-        tier_names = {
-            QualityTier.EXCELLENT: "EMPRESA EXCELENTE",
-            QualityTier.GOOD: "EMPRESA BOA", 
-            QualityTier.AVERAGE: "EMPRESA MEDIANA",
-            QualityTier.BELOW_AVERAGE: "EMPRESA FRACA",
-            QualityTier.POOR: "EMPRESA PROBLEMÁTICA"
-        }
-        
-        return f"""
-{tier_names.get(quality_tier, 'EMPRESA')} (Score: {score:.1f}/100)
+        return _JUSTIFICATION_TEMPLATE.format_map({
+            'tier_name': _TIER_NAMES.get(quality_tier, 'EMPRESA'),
+            'tier_title': _TIER_TITLES[quality_tier],
+            'score': score,
+            'stock_code': stock_code,
+            'date': (now or datetime.now()).strftime('%d/%m/%Y %H:%M')
+        })
 
-ANÁLISE DE {stock_code}:
-• Score Composto: {score:.1f}/100
-• Qualidade: {quality_tier.value.title()}
-• Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-
-SISTEMA ROBUSTO:
-• Funciona independente do schema do banco
-• Fallbacks automáticos para dados faltantes
-• Compatível com Fase 1 e Fase 2
-        """.strip()
+@functools.lru_cache(maxsize=1)
+def _get_analyzer() -> RobustFundamentalAnalyzer:
+    """Instância compartilhada do analisador (componentes detectados uma vez)"""
+    return RobustFundamentalAnalyzer()
 
-def robust_quick_analysis(stock_code: str) -> Dict[str, Any]:
+def robust_quick_analysis(stock_code: str, refresh: bool = False) -> Mapping[str, Any]:
     """Análise rápida usando sistema robusto"""
-    analyzer = RobustFundamentalAnalyzer()
-    return analyzer.analyze_single_stock(stock_code)
+    return _get_analyzer().analyze_single_stock(stock_code, refresh=refresh)
 
 def test_robust_system():
     """Testa sistema robusto"""
@@ -690,7 +1013,37 @@ def test_robust_system():
         except Exception as e:
             print(f"❌ {stock}: Erro - {e}")
     
-    return True
+    # Lote e análise individual devem produzir o mesmo resultado
+    analyzer = _get_analyzer()
+    consistent = True
+    for stock in test_stocks:
+        batch = analyzer.analyze_many([stock])[0]
+        single = analyzer.analyze_single_stock(stock)
+        if batch.get("fundamental_score") is None or single.get("fundamental_score") is None:
+            continue
+        
+        batch_score = batch["fundamental_score"]
+        single_score = single["fundamental_score"]
+        if (batch_score["composite_score"] != single_score["composite_score"]
+                or batch_score["quality_tier"] != single_score["quality_tier"]
+                or batch["recommendation"] != single["recommendation"]):
+            consistent = False
+            print(f"❌ {stock}: lote {batch_score['composite_score']:.1f} "
+                  f"!= individual {single_score['composite_score']:.1f}")
+    
+    if consistent:
+        print("✅ Lote e análise individual consistentes")
+    
+    # Sucesso e erro devem serializar pelo mesmo caminho
+    try:
+        json.loads(analyzer.analyze_single_stock(test_stocks[0]).to_json())
+        json.loads(analyzer._error_result(test_stocks[0], ValueError("teste")).to_json())
+        print("✅ Serialização JSON de sucesso e erro")
+    except Exception as e:
+        consistent = False
+        print(f"❌ Serialização JSON: {e}")
+    
+    return consistent
 
 if __name__ == "__main__":
     test_robust_system()
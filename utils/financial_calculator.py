@@ -94,7 +94,7 @@ class DataQuality(Enum):
     POOR = "poor"           # <50%
 
 
-@dataclass
+@dataclass(slots=True)
 class FinancialData:
     """Estrutura de dados financeiros para cálculos"""
     # Dados básicos
@@ -131,7 +131,7 @@ class FinancialData:
     data_quality_score: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FinancialMetrics:
     """Resultado dos cálculos de métricas financeiras"""
     # Métricas de Valuation